@@ -0,0 +1,327 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Evaluate many saved profiles in one interpreter across a process pool."""
+
+import glob
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+from concurrent.futures import ProcessPoolExecutor
+from logging import debug, error
+from multiprocessing.util import Finalize
+from .cache import ResultCache
+from .results import evaluate
+
+__all__ = [
+        "expand_profiles",
+        "evaluate_file",
+        "run_batch",
+        "run_stream"]
+
+
+def expand_profiles(paths):
+    """Expand directories, globs and plain files into a list of profiles."""
+    profiles = []
+    for path in paths:
+        if os.path.isdir(path):
+            profiles.extend(sorted(glob.glob(os.path.join(path, '*.profile'))))
+        elif os.path.exists(path):
+            profiles.append(path)
+        else:
+            matches = sorted(glob.glob(path))
+            if not matches:
+                error('Can not find any profile by %s.' % path)
+            profiles.extend(matches)
+    return profiles
+
+
+def result_record(results, **extra):
+    """Build the JSON serializable record of a list of Result."""
+    record = dict(extra)
+    record["results"] = [result._asdict() for result in results]
+    return record
+
+
+def evaluate_file(filename, cache=None):
+    """Evaluate one profile file and return its JSON serializable record."""
+    try:
+        with open(filename, "r") as data:
+            profile = json.load(data)
+        return result_record(evaluate(profile, cache), profile=filename)
+    except (OSError, ValueError, KeyError, TypeError) as err:
+        return {"profile": filename, "error": str(err)}
+
+
+# The ResultCache of a worker process of run_batch(), so every worker opens
+# one connection to the database for all its profiles.
+_worker_cache = None
+
+
+def _init_worker(cache):
+    global _worker_cache
+    _worker_cache = cache
+    if cache is not None:
+        # The workers end without atexit, only with the finalizers of
+        # multiprocessing.
+        Finalize(None, cache.flush, exitpriority=0)
+
+
+def _evaluate_in_worker(filename):
+    # An exception leaving a worker would abort the whole run.
+    try:
+        return evaluate_file(filename, _worker_cache)
+    except Exception as err:
+        return {"profile": filename,
+                "error": "%s: %s" % (type(err).__name__, err)}
+
+
+def evaluate_line(line, number, cache=None):
+    """Evaluate one JSON document and return its JSON serializable record."""
+    try:
+        return result_record(evaluate(json.loads(line), cache), line=number)
+    except (ValueError, KeyError, TypeError) as err:
+        return {"line": number, "error": str(err)}
+    except Exception as err:
+        # One bad line must not stop the stream.
+        return {"line": number,
+                "error": "%s: %s" % (type(err).__name__, err)}
+
+
+def run_batch(paths, workers=None, chunksize=64, output=sys.stdout,
+              cache=None):
+    """Evaluate all profiles and write one JSON line per profile.
+
+    Returns the number of profiles which could not be evaluated."""
+    profiles = expand_profiles(paths)
+    debug("Evaluating %d profiles with %s workers" % (len(profiles), workers))
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache,)) as executor:
+        for record in executor.map(_evaluate_in_worker, profiles,
+                                   chunksize=chunksize):
+            if "error" in record:
+                failures = failures + 1
+            output.write(json.dumps(record) + '\n')
+    output.flush()
+    if cache is not None:
+        cache.evict()
+    return failures
+
+
+def run_stream(source=sys.stdin, output=sys.stdout, cache=None):
+    """Evaluate newline-delimited JSON profiles as they arrive.
+
+    One JSON line is written and flushed for every input line, so memory
+    stays bounded whatever the length of the input is and the output lines
+    match the input lines. Returns the number of lines which could not be
+    evaluated, blank lines included."""
+    failures = 0
+    for number, line in enumerate(source, 1):
+        if not line.strip():
+            record = {"line": number, "error": "Empty line."}
+        else:
+            record = evaluate_line(line, number, cache)
+        if "error" in record:
+            failures = failures + 1
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+    if cache is not None:
+        cache.evict()
+    return failures
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.profile = {
+            'Product Type': 1,
+            'Computer Type': 3,
+            'CPU Clock': 2.0,
+            'CPU Cores': 2,
+            'Discrete Audio': False,
+            'Discrete Graphics Cards': 0,
+            'Switchable Graphics': False,
+            'Disk Number': 1,
+            'SSD': 1,
+            'Display Diagonal': 14,
+            'Display Height': 768,
+            'Display Width': 1366,
+            'Screen Area': 83.4,
+            'Enhanced Display': False,
+            'Gigabit Ethernet': 1,
+            '1~10 Gigabit Ethernet': 0,
+            '10 Gigabit Ethernet': 0,
+            'Memory Size': 8,
+            'TV Tuner': False,
+            'Wake-on-LAN': False,
+            'Off Mode': 1.0,
+            'Sleep Mode': 1.7,
+            'Long Idle Mode': 8.0,
+            'Short Idle Mode': 10.0}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content):
+        filename = os.path.join(self.tmpdir.name, name)
+        with open(filename, 'w') as data:
+            data.write(content)
+        return filename
+
+    def test_expand_profiles(self):
+        a = self.write('a.profile', '{}')
+        b = self.write('b.profile', '{}')
+        self.write('a.report', '')
+        os.mkdir(os.path.join(self.tmpdir.name, 'sub'))
+        c = self.write(os.path.join('sub', 'c.profile'), '{}')
+        self.assertEqual(expand_profiles([self.tmpdir.name]), [a, b])
+        self.assertEqual(expand_profiles(
+            [os.path.join(self.tmpdir.name, '*', '*.profile'), a]), [c, a])
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(expand_profiles(
+                [os.path.join(self.tmpdir.name, 'x*.profile'), b]), [b])
+
+    def test_bad_profile(self):
+        good = self.write('good.profile', json.dumps(self.profile))
+        bad = self.write('bad.profile', '{"Product Type": 1')
+        record = evaluate_file(bad)
+        self.assertEqual(record['profile'], bad)
+        self.assertIn('error', record)
+        incomplete = dict(self.profile)
+        del incomplete['Memory Size']
+        self.write('incomplete.profile', json.dumps(incomplete))
+        output = io.StringIO()
+        self.assertEqual(run_batch([self.tmpdir.name], workers=1,
+                                   output=output), 2)
+        records = [json.loads(line) for line in
+                   output.getvalue().splitlines()]
+        self.assertEqual([os.path.basename(record['profile'])
+                          for record in records],
+                         ['bad.profile', 'good.profile',
+                          'incomplete.profile'])
+        self.assertEqual(records[1], evaluate_file(good))
+        self.assertEqual(records[2]['error'],
+                         "'Memory Size' is missing in the profile.")
+
+    def test_invalid_profiles(self):
+        for name, change in (('a', {}), ('b', {'Product Type': 5}),
+                             ('c', {}), ('d', {'Computer Type': 4}),
+                             ('e', {})):
+            self.write(name + '.profile',
+                       json.dumps(dict(self.profile, **change)))
+        output = io.StringIO()
+        self.assertEqual(run_batch([self.tmpdir.name], workers=2,
+                                   chunksize=2, output=output), 2)
+        records = [json.loads(line) for line in
+                   output.getvalue().splitlines()]
+        self.assertEqual([os.path.basename(record['profile'])
+                          for record in records],
+                         ['a.profile', 'b.profile', 'c.profile',
+                          'd.profile', 'e.profile'])
+        self.assertEqual(records[1]['error'],
+                         "'Product Type' 5 is invalid in the profile.")
+        self.assertEqual(records[3]['error'],
+                         "'Computer Type' 4 is invalid in the profile.")
+        for record in records[0::2]:
+            self.assertIn('results', record)
+
+    def test_worker_error(self):
+        class Broken:
+            def get(self, profile):
+                raise RuntimeError('broken')
+
+        filename = self.write('a.profile', json.dumps(self.profile))
+        with mock.patch.object(sys.modules[__name__], '_worker_cache',
+                               Broken()):
+            self.assertEqual(_evaluate_in_worker(filename),
+                             {"profile": filename,
+                              "error": "RuntimeError: broken"})
+
+    def test_pool(self):
+        profiles = []
+        for number in range(7):
+            profile = dict(self.profile, **{'Off Mode': number / 4})
+            profiles.append(self.write('p%d.profile' % number,
+                                       json.dumps(profile)))
+        expected = [evaluate_file(profile) for profile in profiles]
+        cache = ResultCache(os.path.join(self.tmpdir.name, 'cache.sqlite'))
+        for run in range(2):
+            start = time.time()
+            output = io.StringIO()
+            self.assertEqual(run_batch(profiles, workers=2, chunksize=3,
+                                       output=output, cache=cache), 0)
+            self.assertEqual([json.loads(line) for line in
+                              output.getvalue().splitlines()], expected)
+        (count, used) = cache._connect().execute(
+            'SELECT COUNT(*), MIN(used) FROM results').fetchone()
+        self.assertEqual(count, 7)
+        # The workers wrote the use times of their hits before exiting.
+        self.assertGreaterEqual(used, start)
+        cache.close()
+
+    def test_stream(self):
+        source = io.StringIO(json.dumps(self.profile) + '\n\n'
+                             + '{"Product Type": \n'
+                             + '[1, 2]\n'
+                             + json.dumps(self.profile))
+        output = io.StringIO()
+        self.assertEqual(run_stream(source, output), 3)
+        records = [json.loads(line) for line in
+                   output.getvalue().splitlines()]
+        self.assertEqual([record['line'] for record in records],
+                         [1, 2, 3, 4, 5])
+        self.assertEqual(records[0]['results'],
+                         [result._asdict() for result in
+                          evaluate(self.profile)])
+        self.assertEqual(records[4], dict(records[0], line=5))
+        self.assertEqual(records[1]['error'], 'Empty line.')
+        for record in records[1:4]:
+            self.assertNotIn('results', record)
+            self.assertIn('error', record)
+
+    def test_stream_invalid(self):
+        lines = [json.dumps(dict(self.profile, **change)) for change in
+                 ({'Product Type': 5}, {}, {'Computer Type': 4}, {})]
+        output = io.StringIO()
+        self.assertEqual(run_stream(io.StringIO('\n'.join(lines)), output),
+                         2)
+        records = [json.loads(line) for line in
+                   output.getvalue().splitlines()]
+        self.assertEqual([record['line'] for record in records],
+                         [1, 2, 3, 4])
+        self.assertEqual(records[0]['error'],
+                         "'Product Type' 5 is invalid in the profile.")
+        self.assertEqual(records[2]['error'],
+                         "'Computer Type' 4 is invalid in the profile.")
+        self.assertIn('results', records[1])
+        self.assertIn('results', records[3])
+
+        with mock.patch(__name__ + '.evaluate',
+                        side_effect=RuntimeError('broken')):
+            self.assertEqual(evaluate_line(lines[1], 7),
+                             {"line": 7, "error": "RuntimeError: broken"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,322 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""On-disk caches of the Result records and of the hardware probes.
+
+The results only depend on the profile and on the version of energy-tools,
+so they are stored in a SQLite database keyed by the hash of both. The
+hardware probes do not change on the same machine until it reboots, so
+they are stored under /var/cache/energy-tools keyed by the DMI product
+name, the BIOS version and the boot ID.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+import unittest
+from logging import debug, warning
+from .common import Result
+from .version import __version__
+
+__all__ = [
+        "ProbeCache",
+        "ResultCache",
+        "default_cache_path",
+        "probe_key",
+        "profile_key"]
+
+MAX_SIZE = 64 * 1024 * 1024
+# Cache hits whose last use time is written in one transaction.
+TOUCH_BATCH = 256
+PROBE_CACHE_DIR = '/var/cache/energy-tools'
+
+
+def default_cache_path():
+    """Return $XDG_CACHE_HOME/energy-tools/results.sqlite"""
+    base = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'energy-tools', 'results.sqlite')
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return dict((key, _normalize(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, float) and value == 0:
+        return 0.0
+    return value
+
+
+def profile_key(profile, version=__version__):
+    """Hash the canonical JSON of a profile together with the version.
+
+    The keys are sorted and -0.0 becomes 0.0. Integers and floats are kept
+    apart because some scenario names print the value as it is given."""
+    canonical = json.dumps(_normalize(profile), sort_keys=True,
+                           separators=(',', ':'), allow_nan=False)
+    return hashlib.sha256(
+        (version + '\n' + canonical).encode('utf8')).hexdigest()
+
+
+class ResultCache:
+    """Least recently used cache of Result records in a SQLite database
+
+    The connection is opened on first use and not pickled, so the cache can
+    be handed to the worker processes of --batch. A cache hit is only a
+    read; the last use times of the hits are written by flush() in one
+    transaction every TOUCH_BATCH hits and before evict() and close()."""
+    def __init__(self, path=None, max_size=MAX_SIZE):
+        self.path = path or default_cache_path()
+        self.max_size = max_size
+        self.connection = None
+        self.disabled = False
+        self.touched = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['connection'] = None
+        state['touched'] = {}
+        return state
+
+    def _connect(self):
+        if self.connection is None and not self.disabled:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.connection = sqlite3.connect(self.path, timeout=60)
+                self.connection.execute('PRAGMA journal_mode=WAL')
+                self.connection.execute(
+                    'CREATE TABLE IF NOT EXISTS results ('
+                    'key TEXT PRIMARY KEY, results TEXT NOT NULL, '
+                    'size INTEGER NOT NULL, used REAL NOT NULL)')
+                self.connection.commit()
+            except (OSError, sqlite3.Error) as err:
+                warning("Can not use the cache %s: %s" % (self.path, err))
+                self.connection = None
+                self.disabled = True
+        return self.connection
+
+    def get(self, profile):
+        """Return the cached list of Result or None."""
+        connection = self._connect()
+        if connection is None:
+            return None
+        key = profile_key(profile)
+        try:
+            row = connection.execute(
+                'SELECT results FROM results WHERE key = ?',
+                (key,)).fetchone()
+        except sqlite3.Error as err:
+            warning("Can not read the cache %s: %s" % (self.path, err))
+            return None
+        if row is None:
+            return None
+        debug("Cache hit %s" % key)
+        self.touched[key] = time.time()
+        if len(self.touched) >= TOUCH_BATCH:
+            self.flush()
+        return [Result(*result) for result in json.loads(row[0])]
+
+    def flush(self):
+        """Write the last use time of the cache hits."""
+        if not self.touched:
+            return
+        touched = [(used, key) for key, used in self.touched.items()]
+        self.touched = {}
+        connection = self._connect()
+        if connection is None:
+            return
+        try:
+            with connection:
+                connection.executemany(
+                    'UPDATE results SET used = ? WHERE key = ?', touched)
+        except sqlite3.Error as err:
+            warning("Can not write the cache %s: %s" % (self.path, err))
+
+    def put(self, profile, results):
+        """Store the list of Result of a profile."""
+        connection = self._connect()
+        if connection is None:
+            return
+        data = json.dumps([list(result) for result in results])
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                    (profile_key(profile), data, len(data), time.time()))
+        except sqlite3.Error as err:
+            warning("Can not write the cache %s: %s" % (self.path, err))
+
+    def evict(self):
+        """Drop the least recently used entries above max_size."""
+        self.flush()
+        connection = self._connect()
+        if connection is None:
+            return
+        try:
+            with connection:
+                total = connection.execute(
+                    'SELECT TOTAL(size) FROM results').fetchone()[0]
+                if total <= self.max_size:
+                    return
+                stale = []
+                for key, size in connection.execute(
+                        'SELECT key, size FROM results ORDER BY used, rowid'):
+                    stale.append((key,))
+                    total = total - size
+                    if total <= self.max_size:
+                        break
+                connection.executemany(
+                    'DELETE FROM results WHERE key = ?', stale)
+            debug("Evicted %d entries from the cache" % len(stale))
+        except sqlite3.Error as err:
+            warning("Can not evict the cache %s: %s" % (self.path, err))
+
+    def close(self):
+        self.flush()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def probe_key(product_name, bios_version, boot_id, version=__version__):
+    """Hash the identity of a machine in one boot with the version."""
+    return hashlib.sha256('\n'.join(
+        (version, product_name, bios_version, boot_id)).encode(
+            'utf8')).hexdigest()
+
+
+class ProbeCache:
+    """Results of the hardware probes of this machine in this boot
+
+    Only one entry is kept. The files are pickles, so they are only loaded
+    if they belong to the current user and nobody else can write them."""
+    def __init__(self, directory=PROBE_CACHE_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, 'probe-%s.pickle' % key)
+
+    def load(self, key):
+        """Return the cached dict of probe results or None."""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as data:
+                stat = os.fstat(data.fileno())
+                if stat.st_uid != os.geteuid() or stat.st_mode & 0o022:
+                    warning("Ignore %s not owned by the user or writable"
+                            " by others." % path)
+                    return None
+                results = pickle.load(data)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError) as err:
+            debug("Can not read the probe cache %s: %s" % (path, err))
+            return None
+        debug("Probe cache hit %s" % path)
+        return results
+
+    def save(self, key, results):
+        """Store the probe results and drop the other entries."""
+        path = self.path(key)
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            (fd, tmp) = tempfile.mkstemp(dir=self.directory,
+                                         suffix='.tmp')
+            with os.fdopen(fd, 'wb') as data:
+                pickle.dump(results, data)
+            os.replace(tmp, path)
+            for stale in glob.glob(os.path.join(self.directory,
+                                                'probe-*.pickle')):
+                if stale != path:
+                    os.remove(stale)
+        except (OSError, pickle.PicklingError) as err:
+            debug("Can not write the probe cache %s: %s" % (path, err))
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmpdir.name, 'a', 'c.db'))
+        self.results = [Result('Energy Star 8.0', 'Notebook', 30.5, 40.25,
+                               'PASS', 24.22360248447205)]
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_profile_key(self):
+        self.assertEqual(profile_key({'a': 1, 'b': -0.0}),
+                         profile_key({'b': 0.0, 'a': 1}))
+        self.assertNotEqual(profile_key({'a': 1}), profile_key({'a': 1.0}))
+        self.assertNotEqual(profile_key({'a': 1}),
+                            profile_key({'a': 1}, version='0'))
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get({'a': 1}))
+        self.cache.put({'a': 1}, self.results)
+        self.assertEqual(self.cache.get({'a': 1}), self.results)
+
+    def test_touch(self):
+        self.cache.put({'a': 1}, self.results)
+        connection = self.cache._connect()
+        changes = connection.total_changes
+        for i in range(3):
+            self.assertEqual(self.cache.get({'a': 1}), self.results)
+        self.assertEqual(connection.total_changes, changes)
+        self.cache.flush()
+        self.assertEqual(connection.total_changes, changes + 1)
+        self.assertEqual(self.cache.touched, {})
+
+    def test_evict(self):
+        self.cache.max_size = 3 * len(json.dumps([list(self.results[0])]))
+        for i in range(5):
+            self.cache.put({'a': i}, self.results)
+        self.cache.get({'a': 0})
+        self.cache.evict()
+        self.assertEqual(self.cache.get({'a': 0}), self.results)
+        self.assertIsNone(self.cache.get({'a': 1}))
+        self.assertIsNone(self.cache.get({'a': 2}))
+        self.assertEqual(self.cache.get({'a': 4}), self.results)
+
+
+class TestProbeCache(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ProbeCache(os.path.join(tmpdir, 'energy-tools'))
+            old = probe_key('Product', '1.0', 'boot-a')
+            new = probe_key('Product', '1.0', 'boot-b')
+            self.assertNotEqual(old, new)
+            self.assertIsNone(cache.load(old))
+            cache.save(old, {'memory': 16.0})
+            self.assertEqual(cache.load(old), {'memory': 16.0})
+            cache.save(new, {'memory': 32.0})
+            self.assertIsNone(cache.load(old))
+            self.assertEqual(cache.load(new), {'memory': 32.0})
+            os.chmod(cache.path(new), 0o666)
+            self.assertIsNone(cache.load(new))
+
+
+if __name__ == '__main__':
+    unittest.main()
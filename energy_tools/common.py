@@ -16,6 +16,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import sys
+from collections import namedtuple
+
+# For the workstations, servers and thin clients or the ErP power mode
+# limits, e_tec and e_tec_max hold the compared quantity (P_TEC, P_OFF,
+# P_IDLE, ...) and its limit. The scenario tells which one it is.
+Result = namedtuple('Result', ['spec', 'scenario', 'e_tec', 'e_tec_max',
+                               'verdict', 'margin'])
+
 
 def result_filter(result, value, maximum):
     if maximum >= value:
@@ -27,3 +37,60 @@ def result_filter(result, value, maximum):
     else:
         delta = (value - maximum) * 100 / maximum
         return "%s (%s%% to pass)" % (result, round(delta, 2))
+
+
+def compare(spec, scenario, value, maximum):
+    """Compare value with maximum and return a Result.
+
+    The margin is the signed distance to the limit in percent of the limit,
+    positive when passing and negative when failing."""
+    if value <= maximum:
+        verdict = 'PASS'
+    else:
+        verdict = 'FAIL'
+    return Result(spec, scenario, value, maximum, verdict,
+                  (maximum - value) * 100 / maximum)
+
+
+class Report:
+    """Collect the output lines of the calculators and render them once.
+
+    Each entry is a line of text and, for the lines giving a verdict, the
+    matching Result record. An entry without text records a verdict which
+    is not printed, such as a passing limit or the second limit of a line."""
+    def __init__(self, echo=False):
+        self.echo = echo
+        self.entries = []
+
+    def add(self, mesg, result=None):
+        if self.echo and mesg is not None:
+            print(mesg)
+        self.entries.append((mesg, result))
+
+    def extend(self, report):
+        for mesg, result in report.entries:
+            self.add(mesg, result)
+
+    def results(self):
+        return [result for mesg, result in self.entries if result]
+
+    def text(self):
+        return '\n'.join(mesg for mesg, result in self.entries
+                         if mesg is not None)
+
+    def render(self, stream=None):
+        if stream is None:
+            stream = sys.stdout
+        if self.entries:
+            stream.write(self.text() + '\n')
+
+    def to_json(self):
+        entries = []
+        for mesg, result in self.entries:
+            entry = {}
+            if mesg is not None:
+                entry["text"] = mesg
+            if result:
+                entry["result"] = result._asdict()
+            entries.append(entry)
+        return json.dumps(entries, indent=4)
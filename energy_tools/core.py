@@ -16,477 +16,30 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import argparse
+import contextlib
 import copy
+import io
 import json
 import os
-import subprocess
 import sys
-from logging import debug, warning, error
+import tempfile
+import unittest
+from unittest import mock
+from logging import debug, info, warning, error
 from .excel_output import *
-from .energystar52 import EnergyStar52
-from .energystar60 import EnergyStar60
-from .energystar70 import EnergyStar70
-from .energystar80 import EnergyStar80
 from .sysinfo import SysInfo
-from .erplot3 import ErPLot3
-from .erplot26 import ErPLot26
-from .common import result_filter
+from .smbios import DMI_TABLE
+from .common import Report
+from .results import calculate_product_type1_estar7, energystar_calculate, \
+    erplot26_calculate, erplot3_calculate, evaluate
+from .batch import run_batch, run_stream
+from .cache import ResultCache
+from .graph import CalcGraph
+from .rapl import POWERCAP, RaplSampler
+from .host import RecordingHost, ReplayHost, StatsHost, host, set_host
 from .version import __version__
 
-def calculate_product_type1_estar5(sysinfo):
-    print("Energy Star 5:")
-    estar52 = EnergyStar52(sysinfo)
-    E_TEC = estar52.equation_one()
-
-    over_128 = estar52.equation_two(True, True)
-    between_64_and_128 = estar52.equation_two(False, True)
-    under_64 = estar52.equation_two(False, False)
-    debug(over_128)
-    debug(between_64_and_128)
-    debug(under_64)
-    different=False
-
-    for i,j,k in zip(over_128, between_64_and_128, under_64):
-        (cat1, max1) = i
-        (cat2, max2) = j
-        (cat3, max3) = k
-        if cat1 != cat2 or max1 != max2 or cat2 != cat3 or max2 != max3:
-            different=True
-    else:
-        if different is True:
-            if sysinfo.computer_type == 3:
-                print("\n  If GPU Frame Buffer Width <= 64 bits,")
-                for i in under_64:
-                    (category, E_TEC_MAX) = i
-                    if E_TEC <= E_TEC_MAX:
-                        result = 'PASS'
-                        operator = '<='
-                    else:
-                        result = 'FAIL'
-                        operator = '>'
-                    print("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-                print("\n  If 64 bits < GPU Frame Buffer Width <= 128 bits,")
-                for i in between_64_and_128:
-                    (category, E_TEC_MAX) = i
-                    if E_TEC <= E_TEC_MAX:
-                        result = 'PASS'
-                        operator = '<='
-                    else:
-                        result = 'FAIL'
-                        operator = '>'
-                    print("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-            else:
-                print("\n  If GPU Frame Buffer Width <= 128 bits,")
-                for i in between_64_and_128:
-                    (category, E_TEC_MAX) = i
-                    if E_TEC <= E_TEC_MAX:
-                        result = 'PASS'
-                        operator = '<='
-                    else:
-                        result = 'FAIL'
-                        operator = '>'
-                    print("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-            print("\n  If GPU Frame Buffer Width > 128 bits,")
-            for i in over_128:
-                (category, E_TEC_MAX) = i
-                if E_TEC <= E_TEC_MAX:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                print("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-        else:
-            for i in under_64:
-                (category, E_TEC_MAX) = i
-                if E_TEC <= E_TEC_MAX:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                print("\n  Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-
-def calculate_product_type1_estar6(sysinfo):
-    print("\nEnergy Star 6:\n")
-    estar60 = EnergyStar60(sysinfo)
-    E_TEC = estar60.equation_one()
-
-    lower = 1.015
-    if sysinfo.computer_type == 2:
-        higher = 1.04
-    else:
-        higher = 1.03
-
-    for AllowancePSU in (1, lower, higher):
-        if sysinfo.discrete:
-            if AllowancePSU == 1:
-                print("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
-            elif AllowancePSU == lower:
-                print("  If power supplies meet lower efficiency requirements,")
-            elif AllowancePSU == higher:
-                print("  If power supplies meet higher efficiency requirements,")
-            for gpu in ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7'):
-                E_TEC_MAX = estar60.equation_two(gpu) * AllowancePSU
-                if E_TEC <= E_TEC_MAX:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                if gpu == 'G1':
-                    gpu = "G1 (FB_BW <= 16)"
-                elif gpu == 'G2':
-                    gpu = "G2 (16 < FB_BW <= 32)"
-                elif gpu == 'G3':
-                    gpu = "G3 (32 < FB_BW <= 64)"
-                elif gpu == 'G4':
-                    gpu = "G4 (64 < FB_BW <= 96)"
-                elif gpu == 'G5':
-                    gpu = "G5 (96 < FB_BW <= 128)"
-                elif gpu == 'G6':
-                    gpu = "G6 (FB_BW > 128; Frame Buffer Data Width < 192 bits)"
-                elif gpu == 'G7':
-                    gpu = "G7 (FB_BW > 128; Frame Buffer Data Width >= 192 bits)"
-                print("    %s (E_TEC) %s %s (E_TEC_MAX) for %s, %s" % (E_TEC, operator, E_TEC_MAX, gpu, result_filter(result, E_TEC, E_TEC_MAX)))
-        else:
-            if AllowancePSU == 1:
-                print("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
-            elif AllowancePSU == lower:
-                print("  If power supplies meet lower efficiency requirements,")
-            elif AllowancePSU == higher:
-                print("  If power supplies meet higher efficiency requirements,")
-            E_TEC_MAX = estar60.equation_two('G1') * AllowancePSU
-            if E_TEC <= E_TEC_MAX:
-                result = 'PASS'
-                operator = '<='
-            else:
-                result = 'FAIL'
-                operator = '>'
-            print("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-
-def tee(mesg, data=None):
-    print(mesg)
-    if data:
-        return data + "\n" + mesg
-    else:
-        return mesg
-
-def calculate_product_type1_estar7(sysinfo):
-    data = tee("\nEnergy Star 7:\n")
-    estar70 = EnergyStar70(sysinfo)
-    E_TEC = estar70.equation_one()
-
-    lower = 1.015
-    if sysinfo.computer_type == 2:
-        higher = 1.04
-    else:
-        higher = 1.03
-
-    if sysinfo.computer_type == 1 or sysinfo.computer_type == 2:
-        for AllowancePSU in (1, lower, higher):
-            if sysinfo.discrete:
-                if AllowancePSU == 1:
-                    data = tee("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,", data)
-                elif AllowancePSU == lower:
-                    data = tee("  If power supplies meet lower efficiency requirements,", data)
-                elif AllowancePSU == higher:
-                    data = tee("  If power supplies meet higher efficiency requirements,", data)
-                for gpu in ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7'):
-                    E_TEC_MAX = estar70.equation_two(gpu) * AllowancePSU
-                    if E_TEC <= E_TEC_MAX:
-                        result = 'PASS'
-                        operator = '<='
-                    else:
-                        result = 'FAIL'
-                        operator = '>'
-                    if gpu == 'G1':
-                        gpu = "G1 (FB_BW <= 16)"
-                    elif gpu == 'G2':
-                        gpu = "G2 (16 < FB_BW <= 32)"
-                    elif gpu == 'G3':
-                        gpu = "G3 (32 < FB_BW <= 64)"
-                    elif gpu == 'G4':
-                        gpu = "G4 (64 < FB_BW <= 96)"
-                    elif gpu == 'G5':
-                        gpu = "G5 (96 < FB_BW <= 128)"
-                    elif gpu == 'G6':
-                        gpu = "G6 (FB_BW > 128; Frame Buffer Data Width < 192 bits)"
-                    elif gpu == 'G7':
-                        gpu = "G7 (FB_BW > 128; Frame Buffer Data Width >= 192 bits)"
-                    data = tee("    %s (E_TEC) %s %s (E_TEC_MAX) for %s, %s" % (E_TEC, operator, E_TEC_MAX, gpu, result_filter(result, E_TEC, E_TEC_MAX)), data)
-            else:
-                if AllowancePSU == 1:
-                    data = tee("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,", data)
-                elif AllowancePSU == lower:
-                    data = tee("  If power supplies meet lower efficiency requirements,", data)
-                elif AllowancePSU == higher:
-                    data = tee("  If power supplies meet higher efficiency requirements,", data)
-                E_TEC_MAX = estar70.equation_two('G1') * AllowancePSU
-                if E_TEC <= E_TEC_MAX:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)), data)
-    else:
-        if sysinfo.discrete:
-            E_TEC_MAX = estar70.equation_two('N/A', sysinfo.fb_bw)
-            if E_TEC <= E_TEC_MAX:
-                result = 'PASS'
-                operator = '<='
-            else:
-                result = 'FAIL'
-                operator = '>'
-            data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)), data)
-        else:
-            E_TEC_MAX = estar70.equation_two('G1')
-            if E_TEC <= E_TEC_MAX:
-                result = 'PASS'
-                operator = '<='
-            else:
-                result = 'FAIL'
-                operator = '>'
-            data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)), data)
-    return data
-
-def calculate_product_type1_estar8(sysinfo):
-    """Calculate Energy Star 8"""
-    data = tee("\nEnergy Star 8:\n")
-    estar80 = EnergyStar80(sysinfo)
-    e_tec = estar80.equation_one()
-    fb_bw = sysinfo.fb_bw
-
-    lower = 0.015
-
-    if sysinfo.computer_type == 1:
-        higher = 0.03
-        for allowance_proxy in (0, 0.12):
-            if allowance_proxy == 0:
-                data = tee("  If the desktop computer doesn't implement a full capability - full network proxy solution,", data)
-            elif allowance_proxy == 0.12:
-                data = tee("  If the desktop computer implements a full capability - full network proxy solution,", data)
-            for allowance_psu in (0, lower, higher):
-                if allowance_psu == 0:
-                    data = tee("   If power supplies do not meet the requirements of Power Supply Efficiency Allowance,", data)
-                elif allowance_psu == lower:
-                    data = tee("   If power supplies meet lower efficiency requirements,", data)
-                elif allowance_psu == higher:
-                    data = tee("   If power supplies meet higher efficiency requirements,", data)
-                e_tec_max = estar80.equation_two(fb_bw) * (1 + allowance_psu + allowance_proxy)
-                if e_tec <= e_tec_max:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                data = tee("     %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)), data)
-    elif sysinfo.computer_type == 2:
-        higher = 0.04
-        for allowance_psu in (0, lower, higher):
-            if allowance_psu == 0:
-                data = tee("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,", data)
-            elif allowance_psu == lower:
-                data = tee("  If power supplies meet lower efficiency requirements,", data)
-            elif allowance_psu == higher:
-                data = tee("  If power supplies meet higher efficiency requirements,", data)
-            e_tec_max = estar80.equation_two(fb_bw) * (1 + allowance_psu)
-            if e_tec <= e_tec_max:
-                result = 'PASS'
-                operator = '<='
-            else:
-                result = 'FAIL'
-                operator = '>'
-            data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)), data)
-    else:
-        data = tee("  If the system doesn't meet the full Mobile Workstation definition,", data)
-        e_tec_max = estar80.equation_two(fb_bw, False)
-        if e_tec <= e_tec_max:
-            result = 'PASS'
-            operator = '<='
-        else:
-            result = 'FAIL'
-            operator = '>'
-        data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)), data)
-
-        data = tee("  If the system meets the full Mobile Workstation definition,", data)
-        e_tec_max = estar80.equation_two(fb_bw, True)
-        if e_tec <= e_tec_max:
-            result = 'PASS'
-            operator = '<='
-        else:
-            result = 'FAIL'
-            operator = '>'
-        data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)), data)
-    return data
-
-def energystar_calculate(sysinfo):
-    if sysinfo.product_type == 1:
-        calculate_product_type1_estar5(sysinfo)
-        calculate_product_type1_estar6(sysinfo)
-        estar7_result = calculate_product_type1_estar7(sysinfo)
-        return estar7_result + "\n" + calculate_product_type1_estar8(sysinfo)
-    elif sysinfo.product_type == 2:
-        # Energy Star 5.2
-        print("Energy Star 5.2:")
-        estar52 = EnergyStar52(sysinfo)
-        P_TEC = estar52.equation_three()
-        P_TEC_MAX = estar52.equation_four()
-        if P_TEC <= P_TEC_MAX:
-            result = 'PASS'
-            operator = '<='
-        else:
-            result = 'FAIL'
-            operator = '>'
-        print("  %s (P_TEC) %s %s (P_TEC_MAX), %s" % (P_TEC, operator, P_TEC_MAX, result_filter(result, P_TEC, P_TEC_MAX)))
-
-        # Energy Star 6.0
-        print("Energy Star 6.0:")
-        estar60 = EnergyStar60(sysinfo)
-        P_TEC = estar60.equation_four()
-        P_TEC_MAX = estar60.equation_five()
-        if P_TEC <= P_TEC_MAX:
-            result = 'PASS'
-            operator = '<='
-        else:
-            result = 'FAIL'
-            operator = '>'
-        print("  %s (P_TEC) %s %s (P_TEC_MAX), %s" % (P_TEC, operator, P_TEC_MAX, result_filter(result, P_TEC, P_TEC_MAX)))
-    elif sysinfo.product_type == 3:
-        # Energy Star 5.2
-        print("Energy Star 5.2:")
-        estar52 = EnergyStar52(sysinfo)
-        for wol in (True, False):
-            (category, P_OFF_MAX, P_IDLE_MAX) = estar52.equation_five(wol)
-            P_OFF = sysinfo.off
-            P_IDLE = sysinfo.short_idle
-
-            if P_OFF <= P_OFF_MAX and P_IDLE <= P_IDLE_MAX:
-                result = 'PASS'
-            else:
-                result = 'FAIL'
-
-            if P_OFF <= P_OFF_MAX:
-                op1 = '<='
-            else:
-                op1 = '>'
-
-            if P_IDLE <= P_IDLE_MAX:
-                op2 = '<='
-            else:
-                op2 = '>'
-            if wol:
-                print("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
-            else:
-                print("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
-            print("    Category %s: %s (P_OFF) %s %s (P_OFF_MAX), %s (P_IDLE) %s %s (P_IDLE_MAX), %s" % (category, P_OFF, op1, P_OFF_MAX, P_IDLE, op2, P_IDLE_MAX, result))
-
-        # Energy Star 6.0
-        print("Energy Star 6.0:")
-        estar60 = EnergyStar60(sysinfo)
-        for wol in (True, False):
-            P_OFF = sysinfo.off
-            P_OFF_MAX = estar60.equation_six(wol)
-            P_IDLE = sysinfo.short_idle
-            P_IDLE_MAX = estar60.equation_seven()
-
-            if P_OFF <= P_OFF_MAX and P_IDLE <= P_IDLE_MAX:
-                result = 'PASS'
-            else:
-                result = 'FAIL'
-
-            if P_OFF <= P_OFF_MAX:
-                op1 = '<='
-            else:
-                op1 = '>'
-
-            if P_IDLE <= P_IDLE_MAX:
-                op2 = '<='
-            else:
-                op2 = '>'
-            if wol:
-                print("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
-            else:
-                print("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
-            print("    %s (P_OFF) %s %s (P_OFF_MAX), %s (P_IDLE) %s %s (P_IDLE_MAX), %s" % (P_OFF, op1, P_OFF_MAX, P_IDLE, op2, P_IDLE_MAX, result))
-
-    elif sysinfo.product_type == 4:
-        # Energy Star 5.2
-        print("Energy Star 5.2:")
-        estar52 = EnergyStar52(sysinfo)
-        for wol in (True, False):
-            if wol:
-                print("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
-            else:
-                print("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
-
-            P_OFF = sysinfo.off
-            P_OFF_MAX = estar52.equation_six(wol)
-
-            P_SLEEP = sysinfo.sleep
-            P_SLEEP_MAX = estar52.equation_seven(wol)
-
-            P_IDLE = sysinfo.short_idle
-            if sysinfo.media_codec:
-                P_IDLE_MAX = 15.0
-                category = 'B'
-            else:
-                P_IDLE_MAX = 12.0
-                category = 'A'
-
-            print("    Category %s:" % (category))
-
-            if P_OFF <= P_OFF_MAX:
-                op1 = '<='
-            else:
-                op1 = '>'
-            print("      %s (P_OFF) %s %s (P_OFF_MAX)" % (P_OFF, op1, P_OFF_MAX))
-
-            if P_SLEEP <= P_SLEEP_MAX:
-                op2 = '<='
-            else:
-                op2 = '>'
-            print("      %s (P_SLEEP) %s %s (P_SLEEP_MAX)" % (P_SLEEP, op2, P_SLEEP_MAX))
-
-            if P_IDLE <= P_IDLE_MAX:
-                op3 = '<='
-            else:
-                op3 = '>'
-            print("      %s (P_IDLE) %s %s (P_IDLE_MAX)" % (P_IDLE, op3, P_IDLE_MAX))
-
-
-            if P_OFF <= P_OFF_MAX and P_SLEEP <= P_SLEEP_MAX and P_IDLE <= P_IDLE_MAX:
-                result = 'PASS'
-            else:
-                result = 'FAIL'
-            print("        %s" % (result))
-        # Energy Star 6.0
-        print("Energy Star 6.0:")
-        estar60 = EnergyStar60(sysinfo)
-        E_TEC = estar60.equation_one()
-        for discrete in (True, False):
-            for wol in (True, False):
-                E_TEC_MAX = estar60.equation_eight(discrete, wol)
-                if discrete:
-                    msg1 = "it has Discrete Graphics enabled"
-                else:
-                    msg1 = "it doesn't have Discrete Graphics enabled"
-                if wol:
-                    msg2 = "Wake-On-LAN (WOL) is enabled"
-                else:
-                    msg2 = "Wake-On-LAN (WOL) is disabled"
-                print("  If %s and %s by default upon shipment," % (msg1, msg2))
-                if E_TEC <= E_TEC_MAX:
-                    operator = '<='
-                    result = 'PASS'
-                else:
-                    operator = '>'
-                    result = 'FAIL'
-                print("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-    else:
-        raise Exception('This is a bug when you see this.')
-
 def chown_for_user(filename):
     if os.geteuid() == 0:
         sudo_uid = int(os.getenv("SUDO_UID"))
@@ -494,6 +47,45 @@ def chown_for_user(filename):
         os.chown(filename, sudo_uid, sudo_gid)
 
 def process(description, args):
+    if hasattr(args, 'no_cache') and args.no_cache:
+        cache = None
+    else:
+        cache = ResultCache()
+    if hasattr(args, 'batch') and args.batch:
+        if run_batch(args.batch, args.workers, args.chunk_size, cache=cache):
+            sys.exit(1)
+        return
+    if hasattr(args, 'stream') and args.stream:
+        if run_stream(cache=cache):
+            sys.exit(1)
+        return
+    if hasattr(args, 'rapl') and args.rapl:
+        rapl_estimate(args.rapl, args.rapl_rate)
+        return
+    if hasattr(args, 'replay_probe') and args.replay_probe:
+        set_host(ReplayHost.load(args.replay_probe))
+    recorder = None
+    if hasattr(args, 'record_probe') and args.record_probe:
+        recorder = RecordingHost(host())
+        set_host(recorder)
+    stats = None
+    if hasattr(args, 'probe_stats') and args.probe_stats:
+        stats = StatsHost(host())
+        set_host(stats)
+    try:
+        process_sysinfo(description, args)
+    finally:
+        if recorder:
+            recorder.save(args.record_probe)
+            print('\nThe probe recording is saved to "' + args.record_probe + '".')
+            chown_for_user(args.record_probe)
+        if stats:
+            stats.save(args.probe_stats)
+            print('\nThe probe statistics are saved to "' + args.probe_stats + '".')
+            chown_for_user(args.probe_stats)
+
+
+def process_sysinfo(description, args):
     print(description + '\n' + '=' * 80)
     if args.test == 1:
         print("""# Test case from Notebooks of Energy Star 5.2 & 6.0
@@ -632,9 +224,7 @@ def process(description, args):
             'Short Idle Mode': 10.0})
     elif args.profile:
         if args.profile == '-':
-            tmp = ''
-            for line in sys.stdin:
-                tmp = tmp + line.strip()
+            tmp = ''.join(line.strip() for line in sys.stdin)
         elif os.path.exists(args.profile):
             try:
                 with open(args.profile, "r") as data:
@@ -649,19 +239,24 @@ def process(description, args):
         profile = json.loads(tmp)
         sysinfo = SysInfo(profile)
     else:
-        sysinfo = SysInfo(manual=args.manual)
+        sysinfo = SysInfo(manual=args.manual,
+                          reprobe=hasattr(args, 'reprobe') and args.reprobe)
 
-    output = energystar_calculate(sysinfo)
+    console = Report()
+    frozen = sysinfo.freeze()
+    graph = CalcGraph(frozen)
+    output = energystar_calculate(frozen, console, graph)
 
+    sysinfo_simulate_4G_ram = None
+    slots = None
     if sysinfo.profile['Product Type'] == 1 and sysinfo.profile["Memory Size"] != 4 and hasattr(args, 'simulate') and args.simulate:
+        slots = sysinfo.get_memory_slots()
+        if slots is None:
+            warning('Can not read the memory slots from %s. Please run as root to simulate 4G ram.' % DMI_TABLE)
+    if slots is not None:
         sysinfo_simulate_4G_ram = copy.deepcopy(sysinfo)
         sysinfo_simulate_4G_ram.profile["Memory Size"] = 4
-        sysinfo_simulate_4G_ram.mem_total_slots = sysinfo._int_cmd("sudo dmidecode -t 16 | grep 'Devices:' | awk -F': ' '{print $2}'")
-        sysinfo_simulate_4G_ram.mem_used_slots = 0
-        for size in subprocess.check_output("sudo dmidecode -t 17 | grep 'Size:.*MB' | awk '{print $2}'",
-                                            shell=True, encoding='utf8').split('\n'):
-            if size:
-                sysinfo_simulate_4G_ram.mem_used_slots = sysinfo_simulate_4G_ram.mem_used_slots + 1
+        (sysinfo_simulate_4G_ram.mem_total_slots, sysinfo_simulate_4G_ram.mem_used_slots) = slots
         sysinfo.profile["Memory Total Slots"] = sysinfo_simulate_4G_ram.mem_total_slots
         sysinfo.profile["Memory Used Slots"] = sysinfo_simulate_4G_ram.mem_used_slots
         # I assum the power consumption depends on used slots.
@@ -677,20 +272,22 @@ def process(description, args):
         sysinfo_simulate_4G_ram.mem_used_slots = 1
         sysinfo_simulate_4G_ram.profile["Memory Total Slots"] = sysinfo_simulate_4G_ram.mem_total_slots
         sysinfo_simulate_4G_ram.profile["Memory Used Slots"] = sysinfo_simulate_4G_ram.mem_used_slots
-        print("\n=======================================================")
-        print("simulate 4G ram, total slots 2, used slot 1 for e-star 7:")
-        print("=======================================================")
-        calculate_product_type1_estar7(sysinfo_simulate_4G_ram)
+        console.add("\n=======================================================")
+        console.add("simulate 4G ram, total slots 2, used slot 1 for e-star 7:")
+        console.add("=======================================================")
+        calculate_product_type1_estar7(sysinfo_simulate_4G_ram.freeze(),
+                                       console)
 
-    erplot3_calculate(sysinfo)
-    erplot26_calculate(sysinfo)
+    erplot3_calculate(frozen, console, graph)
+    erplot26_calculate(frozen, console)
+    console.render()
 
     if not args.profile:
         profile = get_system_filename(sysinfo) + '.profile'
         sysinfo.save(profile)
         print('\nThe profile is saved to "' + profile + '".')
         chown_for_user(profile)
-        if hasattr(args, 'simulate') and args.simulate:
+        if sysinfo_simulate_4G_ram is not None:
             profile_simulate_4G_ram = get_system_filename(sysinfo_simulate_4G_ram) + '_simulate_4G_ram.profile'
             sysinfo_simulate_4G_ram.save(profile_simulate_4G_ram)
             print('\nThe simulated 4G ram profile is saved to "' + profile_simulate_4G_ram + '".')
@@ -704,7 +301,7 @@ def process(description, args):
         sysinfo.report(report)
         try:
             with open(report, 'a') as target:
-                target.write(output + '\n')
+                target.write(output.text() + '\n')
         except PermissionError as err:
             if 'SNAP_NAME' in os.environ and os.environ['SNAP_NAME'] == 'energy-tools':
                 error('Please execute `snap connect energy-tools:home` to get the permissions.')
@@ -712,6 +309,16 @@ def process(description, args):
         print('\nThe report is saved to "' + report + '".')
         chown_for_user(report)
 
+    if hasattr(args, 'json') and args.json:
+        if args.profile and args.profile != '-':
+            json_report = '.'.join(args.profile.split('.')[:-1]) + '.json'
+        else:
+            json_report = get_system_filename(sysinfo) + '.json'
+        with open(json_report, 'w') as target:
+            target.write(console.to_json() + '\n')
+        print('\nThe JSON report is saved to "' + json_report + '".')
+        chown_for_user(json_report)
+
     if args.excel:
         if args.profile:
             excel = '.'.join(args.profile.split('.')[:-1]) + '.xlsx'
@@ -722,26 +329,141 @@ def process(description, args):
         chown_for_user(excel)
 
 
-def get_system_filename(sysinfo):
-    return sysinfo.get_product_name() + '_' + sysinfo.get_bios_version()
+def rapl_estimate(seconds, rate):
+    sampler = RaplSampler(rate=rate, window=seconds)
+    if not sampler.domains:
+        error('Can not find any RAPL package domain in %s.' % POWERCAP)
+        return
+    info('Sampling the RAPL energy counters for %s seconds. Please keep the system idle.' % seconds)
+    try:
+        sampler.run(seconds)
+    except PermissionError:
+        error('Please run as root to read the RAPL energy counters.')
+        return
+    watts = sampler.mean()
+    if watts is None:
+        error('No RAPL sample in %s seconds.' % seconds)
+        return
+    print('Estimated processor package power: %.2f W' % watts)
+    print('This is only an estimate of the processor packages reported by RAPL, not the power of the system at the wall.')
+    print('Do not use it as the power consumption of Off, Sleep, Long Idle or Short Idle Mode.')
 
 
-def erplot3_calculate(sysinfo):
-    if sysinfo.product_type != 1:
-        return
-    if sysinfo.computer_type == 3:
-        if sysinfo.diagonal < 9 or sysinfo.long_idle < 6:
-            return
-    erplot3 = ErPLot3(sysinfo)
-    erplot3.calculate()
+def get_system_filename(sysinfo):
+    return sysinfo.get_product_name() + '_' + sysinfo.get_bios_version()
 
 
-def erplot26_calculate(sysinfo):
-    if sysinfo.product_type != 1:
-        return
-    if sysinfo.computer_type != 3:
-        return
-    if sysinfo.diagonal > 9 and sysinfo.long_idle > 6:
-        return
-    erplot26 = ErPLot26(sysinfo)
-    erplot26.calculate()
+class TestProcess(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        notebook = {
+            'Product Type': 1,
+            'Computer Type': 3,
+            'CPU Clock': 2.0,
+            'CPU Cores': 2,
+            'Discrete Audio': False,
+            'Discrete Graphics Cards': 0,
+            'Switchable Graphics': False,
+            'Disk Number': 1,
+            'SSD': 1,
+            'Display Diagonal': 14,
+            'Display Height': 768,
+            'Display Width': 1366,
+            'Screen Area': 83.4,
+            'Enhanced Display': False,
+            'Gigabit Ethernet': 1,
+            '1~10 Gigabit Ethernet': 0,
+            '10 Gigabit Ethernet': 0,
+            'Memory Size': 8,
+            'TV Tuner': False,
+            'Wake-on-LAN': False,
+            'Off Mode': 0.3,
+            'Sleep Mode': 1.0,
+            'Long Idle Mode': 5.0,
+            'Short Idle Mode': 10.0}
+        desktop = dict(notebook, **{
+            'Computer Type': 1,
+            'Wake-on-LAN': True,
+            'Off Mode with WOL': 0.8,
+            'Sleep Mode with WOL': 2.0,
+            'Long Idle Mode': 20.0,
+            'Short Idle Mode': 30.0})
+        self.profiles = [
+            notebook,
+            dict(notebook, **{'Off Mode': 0.7, 'Sleep Mode': 2.5}),
+            dict(notebook, **{'Long Idle Mode': 8.0, 'Sleep Mode': 3.5}),
+            desktop,
+            dict(desktop, **{'Discrete Graphics Cards': 1,
+                             'Frame Buffer Bandwidth': 64.0,
+                             'Off Mode': 0.6, 'Sleep Mode': 6.0}),
+            {'Product Type': 2, 'Disk Number': 2, 'SSD': 2,
+             'Gigabit Ethernet': 0, '1~10 Gigabit Ethernet': 0,
+             '10 Gigabit Ethernet': 0,
+             'Off Mode': 2.0, 'Sleep Mode': 4.0, 'Long Idle Mode': 50.0,
+             'Short Idle Mode': 80.0, 'Maximum Power': 180.0},
+            {'Product Type': 3, 'Memory Size': 4, 'CPU Clock': 2.0,
+             'CPU Cores': 1, 'More Discrete Graphics': False,
+             'Gigabit Ethernet': 1, '1~10 Gigabit Ethernet': 0,
+             '10 Gigabit Ethernet': 0, 'Disk Number': 1, 'Off Mode': 2.7, 'Short Idle Mode': 65.0},
+            {'Product Type': 4, 'Integrated Display': True,
+             'Display Width': 1366, 'Display Height': 768,
+             'Display Diagonal': 14, 'Screen Area': 83.4,
+             'Enhanced Display': True, 'Discrete Graphics': False,
+             'Off Mode': 2.7, 'Sleep Mode': 2.7, 'Long Idle Mode': 15.0,
+             'Short Idle Mode': 15.0, 'Gigabit Ethernet': 1,
+             '1~10 Gigabit Ethernet': 0, '10 Gigabit Ethernet': 0,
+             'Media Codec': True}]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def process(self, number, simulate=False, report=False):
+        """Run process_sysinfo() with -p -j and return the console output."""
+        filename = os.path.join(self.tmpdir.name, '%d.profile' % number)
+        with open(filename, 'w') as data:
+            json.dump(self.profiles[number], data)
+        args = argparse.Namespace(test=None, profile=filename,
+                                  manual=False, simulate=simulate,
+                                  report=report, json=True, excel=False)
+        console = io.StringIO()
+        # chown_for_user() gives the files back to the sudo user.
+        with mock.patch.dict(os.environ, SUDO_UID=str(os.getuid()),
+                             SUDO_GID=str(os.getgid())), \
+                contextlib.redirect_stdout(console):
+            process_sysinfo('energy-tools', args)
+        return console.getvalue()
+
+    def test_json_matches_evaluate(self):
+        for number, profile in enumerate(self.profiles):
+            self.process(number)
+            filename = os.path.join(self.tmpdir.name, '%d.profile' % number)
+            with open(filename[:-len('.profile')] + '.json', 'r') as data:
+                entries = json.load(data)
+            self.assertEqual([entry['result'] for entry in entries
+                              if 'result' in entry],
+                             [result._asdict()
+                              for result in evaluate(profile)])
+
+    def test_report(self):
+        for number, profile in enumerate(self.profiles):
+            profile['BIOS version'] = 'TEST'
+            self.process(number, report=True)
+            filename = os.path.join(self.tmpdir.name, '%d.report' % number)
+            with open(filename, 'r') as data:
+                report = data.read()
+            self.assertIn('BIOS version: TEST', report)
+            self.assertIn('Energy Star', report)
+            self.assertEqual('Computer Type' in report,
+                             profile['Product Type'] == 1)
+
+    def test_simulate_without_smbios(self):
+        previous = set_host(ReplayHost({}, {}))
+        try:
+            with self.assertLogs(level='WARNING') as logs:
+                console = self.process(3, simulate=True)
+        finally:
+            set_host(previous)
+        self.assertIn('Can not read the memory slots', logs.output[0])
+        self.assertNotIn('simulate 4G ram', console)
+        self.assertIn('Energy Star 8:', console)
+        self.assertIn('ErP Lot 3 from 1 January 2016:', console)
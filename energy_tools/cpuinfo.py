@@ -0,0 +1,132 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Parser of /proc/cpuinfo read once in process."""
+
+import re
+import unittest
+from collections import namedtuple
+
+__all__ = [
+        "CpuInfo",
+        "Processor"]
+
+Processor = namedtuple('Processor', ['processor', 'vendor_id', 'model_name',
+                                     'physical_id', 'cpu_cores', 'siblings'])
+
+FIELDS = {
+    'processor': ('processor', int),
+    'vendor_id': ('vendor_id', str),
+    'model name': ('model_name', str),
+    'physical id': ('physical_id', int),
+    'cpu cores': ('cpu_cores', int),
+    'siblings': ('siblings', int)}
+
+
+class CpuInfo:
+    """Processors listed in /proc/cpuinfo"""
+    def __init__(self, text):
+        self.processors = []
+        block = {}
+        for line in text.split('\n') + ['']:
+            if not line.strip():
+                if block:
+                    self.processors.append(Processor(**dict(
+                        (field, block.get(field))
+                        for field in Processor._fields)))
+                    block = {}
+                continue
+            (key, sep, value) = line.partition(':')
+            key = key.strip()
+            if sep and key in FIELDS:
+                (field, kind) = FIELDS[key]
+                try:
+                    block[field] = kind(value.strip())
+                except ValueError:
+                    pass
+
+    @classmethod
+    def read(cls, path='/proc/cpuinfo'):
+        with open(path, 'r') as cpuinfo:
+            return cls(cpuinfo.read())
+
+    def _first(self, field):
+        for processor in self.processors:
+            value = getattr(processor, field)
+            if value is not None:
+                return value
+        return None
+
+    @property
+    def vendor(self):
+        """'intel', 'amd' or 'unknown'"""
+        vendor_id = self._first('vendor_id') or ''
+        if re.search("intel", vendor_id, re.IGNORECASE):
+            return 'intel'
+        if re.search("amd", vendor_id, re.IGNORECASE):
+            return 'amd'
+        return 'unknown'
+
+    @property
+    def cores(self):
+        """Cores per physical package, None if not listed"""
+        return self._first('cpu_cores')
+
+    @property
+    def siblings(self):
+        """Threads per physical package, None if not listed"""
+        return self._first('siblings')
+
+    @property
+    def clock(self):
+        """Clock in GHz given by the model name, None if not listed"""
+        model_name = self._first('model_name') or ''
+        match = re.search(r'([0-9.]+)GHz', model_name)
+        if match:
+            return float(match.group(1))
+        return None
+
+
+class TestCpuInfo(unittest.TestCase):
+    def test_intel(self):
+        block = """processor\t: %d
+vendor_id\t: GenuineIntel
+model name\t: Intel(R) Core(TM) i7-8550U CPU @ 1.80GHz
+physical id\t: 0
+siblings\t: 8
+cpu cores\t: 4
+flags\t\t: fpu vme de pse
+"""
+        cpuinfo = CpuInfo('\n'.join(block % i for i in range(8)))
+        self.assertEqual(len(cpuinfo.processors), 8)
+        self.assertEqual(cpuinfo.vendor, 'intel')
+        self.assertEqual(cpuinfo.cores, 4)
+        self.assertEqual(cpuinfo.siblings, 8)
+        self.assertEqual(cpuinfo.clock, 1.8)
+
+    def test_arm(self):
+        cpuinfo = CpuInfo("processor\t: 0\nBogoMIPS\t: 48.00\n\n"
+                          "processor\t: 1\nBogoMIPS\t: 48.00\n")
+        self.assertEqual(len(cpuinfo.processors), 2)
+        self.assertEqual(cpuinfo.vendor, 'unknown')
+        self.assertIsNone(cpuinfo.cores)
+        self.assertIsNone(cpuinfo.clock)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,15 +17,17 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from logging import debug, warning
+from .graph import CalcGraph
 
 class EnergyStar52:
     """Energy Star 5.2 calculator"""
-    def __init__(self, sysinfo):
+    def __init__(self, sysinfo, graph=None):
         self.sysinfo = sysinfo
+        self.graph = graph or CalcGraph(sysinfo)
         debug("=== Energy Star 5.2 ===")
 
     def qualify_desktop_category(self, category, discrete=False, over_frame_buffer_width_128=False):
-        (core, clock, memory, disk) = self.sysinfo.get_basic_info()
+        (core, clock, memory, disk) = self.graph['basic_info']
 
         if category == 'D':
             if core >= 4:
@@ -47,7 +49,7 @@ class EnergyStar52:
         return False
 
     def qualify_netbook_category(self, category, discrete=False, over_frame_buffer_width_128=False):
-        (core, clock, memory, disk) = self.sysinfo.get_basic_info()
+        (core, clock, memory, disk) = self.graph['basic_info']
 
         if category == 'C':
             if core >= 2 and memory >= 2:
@@ -62,25 +64,12 @@ class EnergyStar52:
 
     def equation_one(self):
         """Equation 1: TEC Calculation (E_TEC) for Desktop, Integrated Desktop, and Notebook Computers"""
-        (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE) = self.sysinfo.get_power_consumptions()
-        P_IDLE = P_SHORT_IDLE
-
-        if self.sysinfo.computer_type == 3:
-            (T_OFF, T_SLEEP, T_IDLE) = (0.6, 0.1, 0.3)
-        else:
-            (T_OFF, T_SLEEP, T_IDLE) = (0.55, 0.05, 0.4)
-
-        E_TEC = ((P_OFF * T_OFF) + (P_SLEEP * T_SLEEP) + (P_IDLE * T_IDLE)) * 8760 / 1000
-
-        debug("T_OFF = %s, T_SLEEP = %s, T_IDLE = %s" % (T_OFF, T_SLEEP, T_IDLE))
-        debug("P_OFF = %s, P_SLEEP = %s, P_IDLE = %s" % (P_OFF, P_SLEEP, P_IDLE))
-
-        return E_TEC
+        return self.graph['E_TEC 5.2']
 
     def equation_two(self, over_frame_buffer_width_128=False, over_frame_buffer_width_64=False):
         """Equation 2: E_TEC_MAX Calculation for Desktop, Integrated Desktop, and Notebook Computers"""
 
-        (core, clock, memory, disk) = self.sysinfo.get_basic_info()
+        (core, clock, memory, disk) = self.graph['basic_info']
 
         result = []
 
@@ -218,7 +207,7 @@ class EnergyStar52:
 
     def equation_five(self, wol):
         """Equation 5: Calculation of P_OFF_MAX for Small-scale Servers"""
-        (core, clock, memory, disk) = self.sysinfo.get_basic_info()
+        (core, clock, memory, disk) = self.graph['basic_info']
 
         P_OFF_BASE = 2.0
         if wol:
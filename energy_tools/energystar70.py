@@ -17,36 +17,25 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from logging import debug, warning
+from .graph import CalcGraph
 from math import tanh
 
 class EnergyStar70:
     """Energy Star 7.0 calculator"""
-    def __init__(self, sysinfo):
+    def __init__(self, sysinfo, graph=None):
         self.sysinfo = sysinfo
+        self.graph = graph or CalcGraph(sysinfo)
         debug("=== Energy Star 7.0 ===")
 
     # Requirements for Desktop, Integrated Desktop, and Notebook Computers
     def equation_one(self):
         """Equation 1: TEC Calculation (E_TEC) for Desktop, Integrated Desktop, Thin Client and Notebook Computers"""
-        (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE) = self.sysinfo.get_power_consumptions()
-        if self.sysinfo.product_type == 4 or self.sysinfo.computer_type == 3:
-            (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = (0.25, 0.35, 0.1, 0.3)
-        else:
-            (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = (0.45, 0.05, 0.15, 0.35)
-
-        E_TEC = ((P_OFF * T_OFF) + (P_SLEEP * T_SLEEP) + (P_LONG_IDLE * T_LONG_IDLE) + (P_SHORT_IDLE * T_SHORT_IDLE)) * 8760 / 1000
-
-        debug("T_OFF = %s, T_SLEEP = %s, T_LONG_IDLE = %s, T_SHORT_IDLE = %s" % (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE))
-        debug("P_OFF = %s, P_SLEEP = %s, P_LONG_IDLE = %s, P_SHORT_IDLE = %s" % (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE))
-
-        return E_TEC
+        return self.graph['E_TEC 6.0']
 
     def equation_two(self, gpu_category, FB_BW=0):
         """Equation 2: E_TEC_MAX Calculation for Desktop, Integrated Desktop, and Notebook Computers"""
-        (core, clock, memory, disk) = self.sysinfo.get_basic_info()
-
-        P = core * clock
-        debug("P = %s" % (P))
+        (core, clock, memory, disk) = self.graph['basic_info']
+        P = self.graph['P']
 
         if self.sysinfo.computer_type == 1 or self.sysinfo.computer_type == 2:
             if P <= 3:
@@ -130,19 +119,7 @@ class EnergyStar70:
 
     def equation_three(self):
         """Equation 3: Calculation of Allowance for Enhanced-performance Integrated Displays"""
-        (diagonal, enhanced_performance_display) = self.sysinfo.get_display()
-        if enhanced_performance_display:
-            if diagonal >= 27.0:
-                EP = 0.75
-            else:
-                EP = 0.3
-        else:
-            EP = 0
-        (width, height) = self.sysinfo.get_resolution()
-        r = 1.0 * width * height / 1000000
-        A =  1.0 * self.sysinfo.get_screen_area()
-        debug("EP = %s, r = %s, A = %s" % (EP, r, A))
-        return (EP, r, A)
+        return self.graph['display']
 
     def equation_four(self):
         """Equation 4: P_TEC Calculation for Workstations""" 
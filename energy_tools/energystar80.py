@@ -19,49 +19,29 @@
 
 from logging import debug, error
 from math import tanh
+from .graph import CalcGraph
 
 
 class EnergyStar80(object):
     """Energy Star 8.0 calculator"""
-    def __init__(self, sysinfo):
+    def __init__(self, sysinfo, graph=None):
         self.sysinfo = sysinfo
+        self.graph = graph or CalcGraph(sysinfo)
         debug("=== Energy Star 8.0 ===")
 
     # Requirements for Desktop, Integrated Desktop, and Notebook Computers
     def equation_one(self):
         """Equation 1: TEC Calculation (E_TEC) for Desktop, Integrated Desktop,
                        Thin Client and Notebook Computers"""
-        (p_off, p_sleep, p_long_idle, p_short_idle) = \
-            self.sysinfo.get_power_consumptions()
-        if self.sysinfo.product_type == 4:
-            (t_off, t_sleep, t_long_idle, t_short_idle) = \
-                (0.45, 0.05, 0.15, 0.35)
-        elif self.sysinfo.computer_type == 3:
-            (t_off, t_sleep, t_long_idle, t_short_idle) = \
-                (0.25, 0.35, 0.1, 0.3)
-        else:
-            (t_off, t_sleep, t_long_idle, t_short_idle) = \
-                (0.15, 0.45, 0.1, 0.3)
-
-        e_tec = ((p_off * t_off) + (p_sleep * t_sleep) +
-                 (p_long_idle * t_long_idle) +
-                 (p_short_idle * t_short_idle)) * 8760 / 1000
-
-        debug("T_OFF = %s, T_SLEEP = %s, T_LONG_IDLE = %s, T_SHORT_IDLE = %s" %
-              (t_off, t_sleep, t_long_idle, t_short_idle))
-        debug("P_OFF = %s, P_SLEEP = %s, P_LONG_IDLE = %s, P_SHORT_IDLE = %s" %
-              (p_off, p_sleep, p_long_idle, p_short_idle))
-
-        return e_tec
+        return self.graph['E_TEC 8.0']
 
     def equation_two(self, fb_bw, mobile_workstation=False):
         """Equation 2: E_TEC_MAX Calculation for
                        Desktop, Integrated Desktop, and Notebook Computers"""
-        (core, clock, memory, disk) = self.sysinfo.get_basic_info()
+        (core, clock, memory, disk) = self.graph['basic_info']
         storage_info = self.sysinfo.profile
 
-        pscore = core * clock
-        debug("P = %s" % (pscore))
+        pscore = self.graph['P']
 
         if self.sysinfo.computer_type == 1:
             if self.sysinfo.discrete:
@@ -174,19 +154,7 @@ class EnergyStar80(object):
     def equation_three(self):
         """Equation 3: Calculation of Allowance for
                        Enhanced-performance Integrated Displays"""
-        (diagonal, enhanced_performance_display) = self.sysinfo.get_display()
-        if enhanced_performance_display:
-            if diagonal >= 27.0:
-                e_p = 0.75
-            else:
-                e_p = 0.3
-        else:
-            e_p = 0
-        (width, height) = self.sysinfo.get_resolution()
-        resolution = 1.0 * width * height / 1000000
-        area = 1.0 * self.sysinfo.get_screen_area()
-        debug("EP = %s, r = %s, A = %s" % (e_p, resolution, area))
-        return (e_p, resolution, area)
+        return self.graph['display']
 
     def equation_four(self):
         """Equation 4: P_TEC Calculation for Workstations"""
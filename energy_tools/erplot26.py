@@ -19,7 +19,7 @@
 import unittest
 from .sysinfo import SysInfo
 from logging import debug, warning
-from .common import result_filter
+from .common import Report, compare, result_filter
 
 __all__ = ["ErPLot26"]
 
@@ -29,22 +29,31 @@ class ErPLot26:
     def __init__(self, sysinfo):
         self.sysinfo = sysinfo
 
-    def calculate(self):
-        print("\nErP Lot 26 Tier 3 (1 Jan 2019):\n")
-        self._verify_s3_s5()
-
-    def _verify_s3_s5(self):
-        passed = True
-
-        if self.sysinfo.sleep_wol > 2:
-            print("  Failed. P_SLEEP_WOL (%s) > 2.0"
-                  % self.sysinfo.sleep_wol)
-            passed = False
-
-        if self.sysinfo.off_wol > 0.5:
-            print("  Failed. P_OFF_WOL (%s) > 0.5" % self.sysinfo.off_wol)
-            passed = False
-
-        if passed:
-            print("  Pass. P_SLEEP_WOL (%s) <= 2.0 and P_OFF_WOL (%s) <= 0.5"
-                  % (self.sysinfo.sleep_wol, self.sysinfo.off_wol))
+    def calculate(self, report=None):
+        if report is None:
+            report = Report(echo=True)
+        report.add("\nErP Lot 26 Tier 3 (1 Jan 2019):\n")
+        self._verify_s3_s5(report)
+        return report
+
+    def _verify_s3_s5(self, report):
+        sleep_wol = compare('ErP Lot 26 Tier 3', 'P_SLEEP_WOL',
+                            self.sysinfo.sleep_wol, 2.0)
+        off_wol = compare('ErP Lot 26 Tier 3', 'P_OFF_WOL',
+                          self.sysinfo.off_wol, 0.5)
+
+        if sleep_wol.verdict == 'PASS' and off_wol.verdict == 'PASS':
+            report.add("  Pass. P_SLEEP_WOL (%s) <= 2.0 and P_OFF_WOL (%s) <= 0.5"
+                       % (self.sysinfo.sleep_wol, self.sysinfo.off_wol),
+                       sleep_wol)
+            report.add(None, off_wol)
+            return
+
+        for verdict in (sleep_wol, off_wol):
+            if verdict.verdict == 'FAIL':
+                report.add("  Failed. %s (%s) > %s" % (verdict.scenario,
+                                                      verdict.e_tec,
+                                                      verdict.e_tec_max),
+                           verdict)
+            else:
+                report.add(None, verdict)
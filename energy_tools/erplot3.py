@@ -19,7 +19,8 @@
 import unittest
 from .sysinfo import SysInfo
 from logging import debug, warning
-from .common import result_filter
+from .common import Report, compare, result_filter
+from .graph import CalcGraph
 
 __all__ = [
         "ErPLot3",
@@ -28,14 +29,19 @@ __all__ = [
 
 class ErPLot3:
     """ErP Lot 3 calculator"""
-    def __init__(self, sysinfo):
+    def __init__(self, sysinfo, graph=None):
         self.sysinfo = sysinfo
-
-    def calculate(self):
-        print("\nErP Lot 3 from 1 January 2016:\n")
-        late = ErPLot3_2016(self.sysinfo)
+        self.graph = graph
+
+    def calculate(self, report=None):
+        if report is None:
+            report = Report(echo=True)
+        self.report = report
+        report.add("\nErP Lot 3 from 1 January 2016:\n")
+        late = ErPLot3_2016(self.sysinfo, self.graph)
         self._verify_s3_s5(late)
         self._calculate(late)
+        return report
 
     def _calculate(self, inst):
         if self.sysinfo.computer_type == 3:
@@ -49,9 +55,11 @@ class ErPLot3:
                 candidates.append((category, ret))
         for cat, meet in candidates:
             if meet:
-                print("  Category %s:" % cat)
+                self.report.add("  Category %s:" % cat)
+                scenario = "Category %s" % cat
             else:
-                print("  Category %s if a discrete graphics card (dGfx) meeting the G3 (with FB Data Width > 128-bit), G4, G5, G6 or G7 classification:" % cat)
+                self.report.add("  Category %s if a discrete graphics card (dGfx) meeting the G3 (with FB Data Width > 128-bit), G4, G5, G6 or G7 classification:" % cat)
+                scenario = "Category %s with G3 (FB_W > 128), G4, G5, G6 or G7" % cat
             TEC_BASE = inst.get_TEC_BASE(cat)
             TEC_MEMORY = inst.get_TEC_MEMORY(cat)
             TEC_STORAGE = inst.get_TEC_STORAGE()
@@ -63,49 +71,35 @@ class ErPLot3:
                 TEC_GRAPHICS = 0
                 E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_STORAGE + TEC_TV_TUNER + TEC_AUDIO + TEC_GRAPHICS
                 debug("TEC_GRAPHICS = %s" % TEC_GRAPHICS)
-                self._verifying(inst, E_TEC_MAX, wol=inst.wol)
+                self._verifying(inst, E_TEC_MAX, wol=inst.wol, scenario=scenario)
             elif inst.discrete_graphics_cards == 1:
                 for gpu in ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7'):
                     TEC_GRAPHICS = inst.get_TEC_GRAPHICS(gpu)
                     E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_STORAGE + TEC_TV_TUNER + TEC_AUDIO + TEC_GRAPHICS
                     debug("TEC_GRAPHICS = %s" % TEC_GRAPHICS)
-                    self._verifying(inst, E_TEC_MAX, gpu=gpu, wol=inst.wol)
+                    self._verifying(inst, E_TEC_MAX, gpu=gpu, wol=inst.wol, scenario=scenario + ', ' + gpu)
             else:
-                print("    No console output because of more than one discrete graphics card.")
+                self.report.add("    No console output because of more than one discrete graphics card.")
 
     def _verify_s3_s5(self, inst):
-        operator = '<='
-        result = 'PASS'
         if self.sysinfo.computer_type != 3:
-            if inst.sleep > 5:
-                print("  Fail because P_SLEEP (%s) > 5.0" % inst.sleep)
-                operator = '>'
-                result = 'FAIL'
-            if inst.sleep_wol > 5.7:
-                print("  Fail because P_SLEEP_WOL (%s) > 5.7" % inst.sleep_wol)
-                operator = '>'
-                result = 'FAIL'
+            (sleep_max, sleep_wol_max) = (5.0, 5.7)
         else:
-            if inst.sleep > 3:
-                print("  Fail because P_SLEEP (%s) > 3.0" % inst.sleep)
-                operator = '>'
-                result = 'FAIL'
-            if inst.sleep_wol > 3.7:
-                print("  Fail because P_SLEEP_WOL (%s) > 3.7" % inst.sleep_wol)
-                operator = '>'
-                result = 'FAIL'
-
-        if inst.off > 0.5:
-            print("  Fail because P_OFF (%s) > 0.5" % inst.off)
-            operator = '>'
-            result = 'FAIL'
-
-        if inst.off_wol > 0.5:
-            print("  Fail because P_OFF_WOL (%s) > 0.5" % inst.off_wol)
-            operator = '>'
-            result = 'FAIL'
+            (sleep_max, sleep_wol_max) = (3.0, 3.7)
+
+        for name, value, maximum in (('P_SLEEP', inst.sleep, sleep_max),
+                                     ('P_SLEEP_WOL', inst.sleep_wol,
+                                      sleep_wol_max),
+                                     ('P_OFF', inst.off, 0.5),
+                                     ('P_OFF_WOL', inst.off_wol, 0.5)):
+            verdict = compare('ErP Lot 3 (2016)', name, value, maximum)
+            if verdict.verdict == 'FAIL':
+                self.report.add("  Fail because %s (%s) > %s"
+                                % (name, value, maximum), verdict)
+            else:
+                self.report.add(None, verdict)
 
-    def _verifying(self, inst, E_TEC_MAX, gpu=None, wol=False):
+    def _verifying(self, inst, E_TEC_MAX, gpu=None, wol=False, scenario=None):
         msg = ''
         if gpu:
             if gpu == 'G1':
@@ -129,10 +123,11 @@ class ErPLot3:
             operator = '>'
             result = 'FAIL'
 
+        verdict = compare('ErP Lot 3 (2016)', scenario, E_TEC, E_TEC_MAX)
         if gpu:
-            print("      For %s, %s (E_TEC) %s %s (E_TEC_MAX), %s" % (gpu, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
+            self.report.add("      For %s, %s (E_TEC) %s %s (E_TEC_MAX), %s" % (gpu, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)), verdict)
         else:
-            print("      %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
+            self.report.add("      %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)), verdict)
 
         if wol:
             E_TEC_WOL = inst.get_E_TEC_WOL()
@@ -141,15 +136,17 @@ class ErPLot3:
             if E_TEC_WOL > E_TEC_MAX:
                 operator = '>'
                 result = 'FAIL'
+            verdict = compare('ErP Lot 3 (2016)', scenario + ', WOL', E_TEC_WOL, E_TEC_MAX)
             if gpu:
-                print("      For %s, %s (E_TEC_WOL) %s %s (E_TEC_MAX), %s" % (gpu, E_TEC_WOL, operator, E_TEC_MAX, result_filter(result, E_TEC_WOL, E_TEC_MAX)))
+                self.report.add("      For %s, %s (E_TEC_WOL) %s %s (E_TEC_MAX), %s" % (gpu, E_TEC_WOL, operator, E_TEC_MAX, result_filter(result, E_TEC_WOL, E_TEC_MAX)), verdict)
             else:
-                print("      %s (E_TEC_WOL) %s %s (E_TEC_MAX), %s" % (E_TEC_WOL, operator, E_TEC_MAX, result_filter(result, E_TEC_WOL, E_TEC_MAX)))
+                self.report.add("      %s (E_TEC_WOL) %s %s (E_TEC_MAX), %s" % (E_TEC_WOL, operator, E_TEC_MAX, result_filter(result, E_TEC_WOL, E_TEC_MAX)), verdict)
 
 class ErPLot3_2014:
     """ErP Lot 3 calculator from 1 July 2014"""
-    def __init__(self, sysinfo):
+    def __init__(self, sysinfo, graph=None):
         debug("=== ErP Lot 3 from 1 July 2014 ===")
+        self.graph = graph or CalcGraph(sysinfo)
         self.computer_type = sysinfo.computer_type
         self.cpu_core = sysinfo.cpu_core
         self.cpu_clock = sysinfo.cpu_clock
@@ -223,13 +220,7 @@ class ErPLot3_2014:
             raise Exception('Should not be here.')
 
     def get_E_TEC(self):
-        if self.computer_type == 3:
-            (T_OFF, T_SLEEP, T_IDLE) = (0.6, 0.1, 0.3)
-        else:
-            (T_OFF, T_SLEEP, T_IDLE) = (0.55, 0.05, 0.4)
-
-        E_TEC = ((T_OFF * self.off) + (T_SLEEP * self.sleep) + (T_IDLE * self.idle)) * 8760 / 1000
-        return E_TEC
+        return self.graph['E_TEC 5.2']
 
     def get_T_values(self):
         if self.computer_type == 3:
@@ -386,8 +377,8 @@ class ErPLot3_2014:
 
 class ErPLot3_2016(ErPLot3_2014):
     """ErP Lot 3 calculator from 1 January 2016"""
-    def __init__(self, sysinfo):
-        ErPLot3_2014.__init__(self, sysinfo)
+    def __init__(self, sysinfo, graph=None):
+        ErPLot3_2014.__init__(self, sysinfo, graph)
         debug("=== ErP Lot 3 from 1 January 2016 ===")
 
     def get_TEC_BASE(self, category):
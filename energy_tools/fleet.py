@@ -0,0 +1,632 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Vectorized calculators evaluating a whole fleet of configurations.
+
+The scalar calculators take one SysInfo at a time. The classes here take
+one NumPy array per column instead and keep the operation order of the
+scalar equations, so the results are identical to them bit for bit. The
+Energy Star 6.0 and 7.0 ones return every GPU category and PSU allowance
+at once.
+
+NumPy is only needed by this module.
+"""
+
+import math
+import random
+import unittest
+import numpy as np
+from .energystar60 import EnergyStar60
+from .energystar70 import EnergyStar70
+from .energystar80 import EnergyStar80
+from .results import evaluate_sysinfo
+from .sysinfo import SysInfo
+
+__all__ = [
+        "COLUMNS",
+        "COMPUTER_TYPES",
+        "FLEET_DTYPE",
+        "GPU_TABLE",
+        "PRODUCT_TYPES",
+        "FleetEnergyStar60",
+        "FleetEnergyStar70",
+        "FleetEnergyStar80",
+        "FleetRow",
+        "FleetTable"]
+
+PRODUCT_TYPES = ('Desktop, Integrated Desktop, and Notebook Computers',
+                 'Workstations', 'Small-scale Servers', 'Thin Clients')
+COMPUTER_TYPES = ('Desktop', 'Integrated Desktop', 'Notebook')
+
+# One typed column per SysInfo field used by the calculators. Product and
+# computer types are stored as their category codes, 0 if not applicable.
+# The numbers stay float64 so the results do not change.
+FLEET_DTYPE = np.dtype([
+    ('product_type', 'u1'), ('computer_type', 'u1'),
+    ('cores', 'i2'), ('clock', 'f8'), ('memory', 'f8'), ('disk', 'i2'),
+    ('hdd35', 'i1'), ('hdd25', 'i1'), ('hybrid', 'i1'), ('ssd', 'i1'),
+    ('glan1', 'i1'), ('glan10', 'i1'), ('glan1to10', 'i1'), ('wol', '?'),
+    ('discrete', '?'), ('discrete_gpus', 'i1'), ('switchable', '?'),
+    ('more_discrete', '?'), ('audio', '?'), ('tvtuner', '?'),
+    ('media_codec', '?'), ('integrated_display', '?'),
+    ('fb_bw', 'f8'), ('diagonal', 'f8'), ('ep', '?'),
+    ('width', 'i4'), ('height', 'i4'), ('area', 'f8'),
+    ('off', 'f8'), ('off_wol', 'f8'), ('sleep', 'f8'), ('sleep_wol', 'f8'),
+    ('long_idle', 'f8'), ('short_idle', 'f8'), ('max_power', 'f8')])
+
+# The columns needed by the Fleet calculators
+COLUMNS = (
+    'product_type', 'computer_type', 'cores', 'clock', 'memory', 'disk',
+    'hdd35', 'hdd25', 'hybrid', 'ssd', 'glan1', 'glan10', 'glan1to10',
+    'discrete', 'switchable', 'fb_bw', 'diagonal', 'ep', 'width', 'height',
+    'area', 'off', 'sleep', 'long_idle', 'short_idle')
+
+# SysInfo attribute name -> FleetTable column
+ATTRIBUTES = {
+    'product_type': 'product_type',
+    'computer_type': 'computer_type',
+    'cpu_core': 'cores',
+    'cpu_clock': 'clock',
+    'mem_size': 'memory',
+    'disk_num': 'disk',
+    'discrete': 'discrete',
+    'discrete_gpu_num': 'discrete_gpus',
+    'switchable': 'switchable',
+    'more_discrete': 'more_discrete',
+    'audio': 'audio',
+    'tvtuner': 'tvtuner',
+    'media_codec': 'media_codec',
+    'integrated_display': 'integrated_display',
+    'fb_bw': 'fb_bw',
+    'diagonal': 'diagonal',
+    'ep': 'ep',
+    'screen_area': 'area',
+    'off': 'off',
+    'off_wol': 'off_wol',
+    'sleep': 'sleep',
+    'sleep_wol': 'sleep_wol',
+    'long_idle': 'long_idle',
+    'short_idle': 'short_idle',
+    'max_power': 'max_power'}
+
+
+def _sysinfo_row(sysinfo):
+    """Convert a SysInfo object into a row of FLEET_DTYPE."""
+    profile = sysinfo.profile
+    if sysinfo.product_type == 3:
+        # Small-scale servers only ask for the number of cores.
+        (core, clock, memory, disk) = (sysinfo.get_cpu_core(), 0.0, 0.0, 0)
+    elif sysinfo.product_type == 1:
+        (core, clock, memory, disk) = sysinfo.get_basic_info()
+    else:
+        (core, clock, memory, disk) = (0, 0.0, 0.0, sysinfo.get_disk_num())
+    values = {
+        'cores': core, 'clock': clock, 'memory': memory, 'disk': disk,
+        'hdd35': profile.get("3.5 inch HDD", 0),
+        'hdd25': profile.get("2.5 inch HDD", 0),
+        'hybrid': profile.get("Hybrid HDD/SSD", 0),
+        'ssd': profile.get("SSD", 0),
+        'glan1': sysinfo.get_1glan_num(),
+        'glan10': sysinfo.get_10glan_num(),
+        'glan1to10': sysinfo.get_1to10glan_num(),
+        'wol': bool(profile.get("Wake-on-LAN")),
+        'width': sysinfo.width or 0,
+        'height': sysinfo.height or 0}
+    for attribute, name in ATTRIBUTES.items():
+        if name not in values:
+            values[name] = getattr(sysinfo, attribute, 0)
+    return tuple(values[name] for name in FLEET_DTYPE.names)
+
+
+class FleetTable:
+    """Profiles stored column by column in a NumPy structured array
+
+    The whole table is one array of FLEET_DTYPE, so a profile costs a few
+    bytes per field instead of a SysInfo object and its profile dict. The
+    table can be given to the Fleet calculators directly, and row() gives a
+    view of one profile the scalar calculators accept in place of SysInfo.
+    """
+    def __init__(self, data=None):
+        if data is None:
+            data = np.zeros(0, dtype=FLEET_DTYPE)
+        self.data = data
+
+    @classmethod
+    def from_sysinfo(cls, sysinfos):
+        """Build a table from SysInfo objects."""
+        data = np.zeros(64, dtype=FLEET_DTYPE)
+        size = 0
+        for sysinfo in sysinfos:
+            if size == len(data):
+                data = np.resize(data, 2 * size)
+            data[size] = _sysinfo_row(sysinfo)
+            size = size + 1
+        return cls(data[:size].copy())
+
+    @classmethod
+    def from_profiles(cls, profiles):
+        """Build a table from complete profile dictionaries.
+
+        Each profile is turned into a SysInfo only while its row is
+        filled, so the dictionaries can come from a generator."""
+        def sysinfos():
+            for profile in profiles:
+                yield SysInfo(dict(profile), interactive=False)
+        return cls.from_sysinfo(sysinfos())
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    def __iter__(self):
+        for index in range(len(self.data)):
+            yield FleetRow(self.data, index)
+
+    def row(self, index):
+        """Return the SysInfo compatible view of one profile."""
+        return FleetRow(self.data, index)
+
+    def labels(self, name):
+        """Return the labels of the 'product_type' or 'computer_type' codes"""
+        if name == 'product_type':
+            categories = ('',) + PRODUCT_TYPES
+        elif name == 'computer_type':
+            categories = ('',) + COMPUTER_TYPES
+        else:
+            raise ValueError("%s is not a categorical column." % name)
+        return np.array(categories)[self.data[name]]
+
+
+class FleetRow:
+    """Read-only view of one row in a FleetTable looking like SysInfo"""
+    __slots__ = ('data', 'index')
+
+    def __init__(self, data, index):
+        self.data = data
+        self.index = index
+
+    def __getattr__(self, attribute):
+        if attribute not in ATTRIBUTES:
+            raise AttributeError(attribute)
+        return self.data[ATTRIBUTES[attribute]][self.index].item()
+
+    def _get(self, name):
+        return self.data[name][self.index].item()
+
+    @property
+    def profile(self):
+        return {"3.5 inch HDD": self._get('hdd35'),
+                "2.5 inch HDD": self._get('hdd25'),
+                "Hybrid HDD/SSD": self._get('hybrid'),
+                "SSD": self._get('ssd'),
+                "Wake-on-LAN": self._get('wol')}
+
+    def get_cpu_core(self):
+        return self.cpu_core
+
+    def get_cpu_clock(self):
+        return self.cpu_clock
+
+    def get_mem_size(self):
+        return self.mem_size
+
+    def get_disk_num(self):
+        return self.disk_num
+
+    def get_basic_info(self):
+        return (self.cpu_core, self.cpu_clock, self.mem_size, self.disk_num)
+
+    def get_power_consumptions(self):
+        return (self.off, self.sleep, self.long_idle, self.short_idle)
+
+    def get_1glan_num(self):
+        return self._get('glan1')
+
+    def get_1to10glan_num(self):
+        return self._get('glan1to10')
+
+    def get_10glan_num(self):
+        return self._get('glan10')
+
+    def get_display(self):
+        return (self.diagonal, self.ep)
+
+    def get_resolution(self):
+        return (self._get('width'), self._get('height'))
+
+    def get_screen_area(self):
+        return self.screen_area
+
+
+def exact_tanh(x):
+    """tanh() of an array, identical to math.tanh().
+
+    np.tanh() may differ in the last bit on SIMD builds, so math.tanh() is
+    evaluated once per distinct argument instead. The FB_BW values of a
+    fleet only take a handful of distinct values."""
+    values, inverse = np.unique(x, return_inverse=True)
+    table = np.array([math.tanh(value) for value in values], dtype=float)
+    return table[inverse].reshape(np.shape(x))
+
+
+# TEC_GRAPHICS of the G1 ~ G7 discrete GPU categories in Energy Star 6.0 and
+# 7.0, indexed by the position of the category in GPU_CATEGORIES.
+GPU_TABLE = {
+    'desktop': np.array([36, 51, 64, 83, 105, 115, 130]),
+    'notebook': np.array([14, 20, 26, 32, 42, 48, 60])}
+
+
+class FleetCalculator:
+    """Common part of the calculators for column arrays
+
+    The columns are given by a FleetTable or any mapping of COLUMNS."""
+    def __init__(self, columns):
+        for name in COLUMNS:
+            setattr(self, name, np.asarray(columns[name]))
+        self.discrete = self.discrete.astype(bool)
+        self.switchable = self.switchable.astype(bool)
+        self.ep = self.ep.astype(bool)
+
+    def psu_allowances(self):
+        """The (none, lower, higher) PSU efficiency allowances of each row"""
+        allowances = np.empty((len(self.computer_type), 3))
+        allowances[:, 0] = 1
+        allowances[:, 1] = 1.015
+        allowances[:, 2] = np.where(self.computer_type == 2, 1.04, 1.03)
+        return allowances
+
+    def equation_three(self):
+        """Equation 3: Calculation of Allowance for
+                       Enhanced-performance Integrated Displays"""
+        e_p = np.where(self.ep, np.where(self.diagonal >= 27.0, 0.75, 0.3), 0)
+        resolution = 1.0 * self.width * self.height / 1000000
+        area = 1.0 * self.area
+        return (e_p, resolution, area)
+
+
+class FleetEnergyStar6x(FleetCalculator):
+    """Shared E_TEC of Energy Star 6.0 and 7.0 for column arrays"""
+    def equation_one(self):
+        """Equation 1: TEC Calculation (E_TEC) for Desktop, Integrated Desktop,
+                       Thin Client and Notebook Computers"""
+        short = (self.product_type == 4) | (self.computer_type == 3)
+        t_off = np.where(short, 0.25, 0.45)
+        t_sleep = np.where(short, 0.35, 0.05)
+        t_long_idle = np.where(short, 0.1, 0.15)
+        t_short_idle = np.where(short, 0.3, 0.35)
+
+        return ((self.off * t_off) + (self.sleep * t_sleep) +
+                (self.long_idle * t_long_idle) +
+                (self.short_idle * t_short_idle)) * 8760 / 1000
+
+    def e_tec_max(self):
+        """E_TEC_MAX of every row, GPU category and PSU allowance
+
+        Returns an array shaped (rows, 7, 3) indexed by the position in
+        GPU_CATEGORIES and by (none, lower, higher) PSU allowance."""
+        return self.equation_two()[:, :, None] * \
+            self.psu_allowances()[:, None, :]
+
+    def _graphics(self, desktop_table, notebook_table):
+        """TEC_GRAPHICS and TEC_SWITCHABLE; TEC_GRAPHICS is (rows, 7)"""
+        desktop = (self.computer_type == 1) | (self.computer_type == 2)
+        discrete = self.discrete & ~self.switchable
+        tec_graphics = np.where(discrete[:, None],
+                                np.where(desktop[:, None],
+                                         desktop_table, notebook_table), 0)
+        tec_switchable = np.where(self.switchable & desktop, 0.5 * 36, 0)
+        return (tec_graphics, tec_switchable)
+
+    def _storage(self):
+        desktop = (self.computer_type == 1) | (self.computer_type == 2)
+        return np.where(desktop, 26 * (self.disk - 1), 2.6 * (self.disk - 1))
+
+
+class FleetEnergyStar60(FleetEnergyStar6x):
+    """Energy Star 6.0 calculator for column arrays"""
+    def equation_two(self):
+        """Equation 2: E_TEC_MAX Calculation for
+                       Desktop, Integrated Desktop, and Notebook Computers
+
+        Returns an array shaped (rows, 7) indexed by GPU category."""
+        notebook = self.computer_type == 3
+        pscore = self.cores * self.clock
+        tec_base = np.select(
+            [~notebook & (pscore <= 3),
+             ~notebook & self.discrete & (pscore <= 9),
+             ~notebook & self.discrete,
+             ~notebook & (pscore <= 6),
+             ~notebook & (pscore <= 7),
+             ~notebook,
+             pscore <= 2,
+             self.discrete & (pscore <= 9),
+             self.discrete,
+             pscore <= 5.2,
+             pscore <= 8],
+            [69.0, 115.0, 135.0, 112.0, 120.0, 135.0,
+             14.0, 16.0, 18.0, 22.0, 24.0], 28.0)
+
+        tec_memory = 0.8 * self.memory
+        (tec_graphics, tec_switchable) = self._graphics(
+            GPU_TABLE['desktop'], GPU_TABLE['notebook'])
+
+        desktop = (self.computer_type == 1) | (self.computer_type == 2)
+        tec_eee = np.where(desktop,
+                           8.76 * 0.2 * (0.15 + 0.35) * self.glan1,
+                           8.76 * 0.2 * (0.10 + 0.30) * self.glan1)
+
+        (e_p, resolution, area) = self.equation_three()
+        tec_int_display = np.select(
+            [(self.computer_type == 2) | (self.product_type == 4), notebook],
+            [8.76 * 0.35 * (1 + e_p) * (4 * resolution + 0.05 * area),
+             8.76 * 0.30 * (1 + e_p) * (2 * resolution + 0.02 * area)], 0)
+
+        return (tec_base + tec_memory)[:, None] + tec_graphics + \
+            (self._storage())[:, None] + tec_int_display[:, None] + \
+            tec_switchable[:, None] + tec_eee[:, None]
+
+
+class FleetEnergyStar70(FleetEnergyStar6x):
+    """Energy Star 7.0 calculator for column arrays
+
+    Discrete graphics of notebooks use the FB_BW column instead of the GPU
+    category, so their rows are the same along the GPU axis."""
+    def equation_two(self):
+        """Equation 2: E_TEC_MAX Calculation for
+                       Desktop, Integrated Desktop, and Notebook Computers
+
+        Returns an array shaped (rows, 7) indexed by GPU category."""
+        desktop = (self.computer_type == 1) | (self.computer_type == 2)
+        pscore = self.cores * self.clock
+        tec_base = np.select(
+            [desktop & (pscore <= 3),
+             desktop & self.discrete & (pscore <= 9),
+             desktop & self.discrete,
+             desktop & (pscore <= 6),
+             desktop & (pscore <= 7),
+             desktop,
+             pscore <= 2,
+             pscore <= 8],
+            [69.0, 115.0, 135.0, 112.0, 120.0, 135.0, 6.5, 8.0], 14.0)
+
+        tec_memory = np.where(self.computer_type != 3, 0.8 * self.memory,
+                              2.4 + 0.294 * self.memory)
+        tanh = exact_tanh(0.0038 * self.fb_bw - 0.137)
+        (tec_graphics, tec_switchable) = self._graphics(
+            GPU_TABLE['desktop'], (29.3 * tanh + 13.4)[:, None])
+
+        tec_eee = np.where(desktop,
+                           8.76 * 0.2 * (0.15 + 0.35) * self.glan1, 0)
+
+        (e_p, resolution, area) = self.equation_three()
+        tec_int_display = np.select(
+            [(self.computer_type == 2) | (self.product_type == 4),
+             self.computer_type == 3],
+            [8.76 * 0.35 * (1 + e_p) * (4 * resolution + 0.05 * area),
+             8.76 * 0.30 * (1 + e_p) * (0.43 * resolution + 0.0263 * area)],
+            0)
+
+        return (tec_base + tec_memory)[:, None] + tec_graphics + \
+            (self._storage())[:, None] + tec_int_display[:, None] + \
+            tec_switchable[:, None] + tec_eee[:, None]
+
+
+class FleetEnergyStar80(FleetCalculator):
+    """Energy Star 8.0 calculator for column arrays"""
+
+    def equation_one(self):
+        """Equation 1: TEC Calculation (E_TEC) for Desktop, Integrated Desktop,
+                       Thin Client and Notebook Computers"""
+        thin_client = self.product_type == 4
+        notebook = self.computer_type == 3
+        t_off = np.select([thin_client, notebook], [0.45, 0.25], 0.15)
+        t_sleep = np.select([thin_client, notebook], [0.05, 0.35], 0.45)
+        t_long_idle = np.select([thin_client, notebook], [0.15, 0.1], 0.1)
+        t_short_idle = np.select([thin_client, notebook], [0.35, 0.3], 0.3)
+
+        return ((self.off * t_off) + (self.sleep * t_sleep) +
+                (self.long_idle * t_long_idle) +
+                (self.short_idle * t_short_idle)) * 8760 / 1000
+
+    def equation_two(self, mobile_workstation=False):
+        """Equation 2: E_TEC_MAX Calculation for
+                       Desktop, Integrated Desktop, and Notebook Computers"""
+        desktop = self.computer_type == 1
+        integrated = self.computer_type == 2
+        notebook = self.computer_type == 3
+
+        pscore = self.cores * self.clock
+        tec_base = np.select(
+            [desktop & self.discrete & (pscore <= 8),
+             desktop & self.discrete,
+             desktop & (pscore <= 8),
+             desktop,
+             integrated & (pscore <= 8),
+             integrated,
+             notebook & (pscore <= 2),
+             notebook & (pscore < 8),
+             notebook],
+            [35.0, 45.0, 26.0, 46.0, 9.0, 27.0, 6.5, 8.0, 14.0], np.nan)
+
+        tec_memory = np.where(notebook, 2.4 + 0.294 * self.memory,
+                              1.7 + 0.24 * self.memory)
+
+        tanh = exact_tanh(0.0038 * self.fb_bw - 0.137)
+        tec_graphics = np.select(
+            [self.switchable, self.discrete & ~notebook, self.discrete],
+            [0, 50.4 * tanh + 23, 29.3 * tanh + 13.4], 0)
+        tec_switchable = np.where(self.switchable & ~notebook, 14.4, 0)
+
+        tec_glan10 = np.where((desktop | integrated) & (self.glan10 != 0),
+                              18.0, 0)
+        tec_glan1to10 = np.where((desktop | integrated) &
+                                 (self.glan1to10 != 0), 4.0, 0)
+
+        tec_storage = np.select(
+            [(self.disk > 1) & notebook, self.disk > 1],
+            [self.hdd35 * 0.0 + self.hdd25 * 2.6 + self.hybrid * 2.6
+             + self.ssd * 2.6,
+             self.hdd35 * 16.5 + self.hdd25 * 2.1 + self.hybrid * 0.8
+             + self.ssd * 0.4], 0)
+
+        (e_p, resolution, area) = self.equation_three()
+        tec_int_display = np.select(
+            [integrated & (area < 190),
+             integrated & (area < 210),
+             integrated & (area < 315),
+             integrated,
+             notebook],
+            [(3.43*resolution + 0.148*area + 1.30)*(1+e_p),
+             (3.43*resolution + 0.018*area + 26.1)*(1+e_p),
+             (3.43*resolution + 0.078*area + 13.2)*(1+e_p),
+             (3.43*resolution + 0.156*area - 11.3)*(1+e_p),
+             8.76*0.30*(1+e_p)*(0.43*resolution+0.0263*area)], 0)
+
+        if mobile_workstation:
+            tec_mobile_workstation = np.where(notebook, 4.0, 0)
+        else:
+            tec_mobile_workstation = 0
+
+        return tec_base + tec_memory + tec_graphics + tec_storage + \
+            tec_int_display + tec_switchable + tec_glan10 + tec_glan1to10 + \
+            tec_mobile_workstation
+
+
+def random_profile(rand):
+    """Generate a random but complete computer profile for the tests."""
+    computer_type = rand.choice((1, 2, 3))
+    graphics = rand.choice(('integrated', 'discrete', 'switchable'))
+    disks = [rand.randint(0, 2) for i in range(4)]
+    width, height = rand.choice(((1366, 768), (1920, 1080), (2560, 1440),
+                                 (3840, 2160)))
+    profile = {
+        'Product Type': 1,
+        'Computer Type': computer_type,
+        'CPU Clock': rand.choice((1.0, 1.6, 2.0, 2.6, 3.2, 4.5)),
+        'CPU Cores': rand.choice((1, 2, 4, 6, 8)),
+        'Memory Size': rand.choice((2, 4, 7.5, 8, 16, 31.25)),
+        'Discrete Audio': False,
+        'TV Tuner': False,
+        'Switchable Graphics': graphics == 'switchable',
+        'Discrete Graphics Cards': int(graphics == 'discrete'),
+        'Frame Buffer Bandwidth': rand.choice((16.0, 64.5, 128.0, 448.0)),
+        'Disk Number': max(sum(disks) + 1, 1),
+        'Unknown / System Disk': 1,
+        '3.5 inch HDD': disks[0],
+        '2.5 inch HDD': disks[1],
+        'Hybrid HDD/SSD': disks[2],
+        'SSD': disks[3],
+        'Display Diagonal': rand.choice((13.3, 15.6, 23.8, 27.0, 31.5)),
+        'Display Width': width,
+        'Display Height': height,
+        'Screen Area': rand.choice((83.4, 189.9, 200.0, 250.0, 315.0, 420.0)),
+        'Enhanced Display': rand.choice((True, False)),
+        'Gigabit Ethernet': rand.randint(0, 2),
+        '1~10 Gigabit Ethernet': rand.randint(0, 1),
+        '10 Gigabit Ethernet': rand.randint(0, 1),
+        'Wake-on-LAN': False,
+        'Off Mode': rand.uniform(0, 2),
+        'Sleep Mode': rand.uniform(0, 5),
+        'Long Idle Mode': rand.uniform(2, 60),
+        'Short Idle Mode': rand.uniform(2, 80)}
+    return profile
+
+
+def random_sysinfos(seed, number):
+    rand = random.Random(seed)
+    return [SysInfo(random_profile(rand), interactive=False)
+            for i in range(number)]
+
+
+class TestFleetEnergyStar6x(unittest.TestCase):
+    def setUp(self):
+        self.sysinfos = random_sysinfos(6, 500)
+        self.columns = FleetTable.from_sysinfo(self.sysinfos)
+
+    def check(self, fleet, calculator):
+        e_tec_max = fleet.e_tec_max()
+        self.assertEqual(e_tec_max.shape, (len(self.sysinfos), 7, 3))
+        self.assertEqual(fleet.equation_one().tolist(),
+                         [calculator(sysinfo).equation_one()
+                          for sysinfo in self.sysinfos])
+        for row, sysinfo in enumerate(self.sysinfos):
+            lower = 1.015
+            higher = 1.04 if sysinfo.computer_type == 2 else 1.03
+            for i, gpu in enumerate(('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7')):
+                if calculator is EnergyStar70:
+                    args = (gpu, sysinfo.fb_bw)
+                else:
+                    args = (gpu,)
+                tec_max = calculator(sysinfo).equation_two(*args)
+                self.assertEqual(e_tec_max[row, i].tolist(),
+                                 [tec_max * 1, tec_max * lower,
+                                  tec_max * higher])
+
+    def test_energystar60(self):
+        self.check(FleetEnergyStar60(self.columns), EnergyStar60)
+
+    def test_energystar70(self):
+        self.check(FleetEnergyStar70(self.columns), EnergyStar70)
+
+
+class TestFleetTable(unittest.TestCase):
+    def setUp(self):
+        self.sysinfos = random_sysinfos(7, 300)
+        self.table = FleetTable.from_sysinfo(self.sysinfos)
+
+    def test_row(self):
+        for sysinfo, row in zip(self.sysinfos, self.table):
+            self.assertEqual(evaluate_sysinfo(row), evaluate_sysinfo(sysinfo))
+
+    def test_from_profiles(self):
+        rand = random.Random(7)
+        table = FleetTable.from_profiles(random_profile(rand)
+                                         for i in range(300))
+        self.assertTrue(np.array_equal(table.data, self.table.data))
+
+    def test_labels(self):
+        labels = self.table.labels('computer_type')
+        self.assertEqual(labels[0],
+                         COMPUTER_TYPES[self.sysinfos[0].computer_type - 1])
+        self.assertLess(FLEET_DTYPE.itemsize, 160)
+
+
+class TestFleetEnergyStar80(unittest.TestCase):
+    def setUp(self):
+        self.sysinfos = random_sysinfos(8, 2000)
+        self.fleet = FleetEnergyStar80(FleetTable.from_sysinfo(self.sysinfos))
+
+    def test_equation_one(self):
+        expected = [EnergyStar80(sysinfo).equation_one()
+                    for sysinfo in self.sysinfos]
+        self.assertEqual(self.fleet.equation_one().tolist(), expected)
+
+    def test_equation_two(self):
+        for mobile_workstation in (False, True):
+            expected = [EnergyStar80(sysinfo).equation_two(
+                sysinfo.fb_bw, mobile_workstation)
+                for sysinfo in self.sysinfos]
+            self.assertEqual(
+                self.fleet.equation_two(mobile_workstation).tolist(),
+                expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
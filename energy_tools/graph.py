@@ -0,0 +1,183 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Intermediate terms shared by the calculators of all specs.
+
+Every term is a named node declaring the nodes it depends on. A CalcGraph
+evaluates each node at most once for its profile, so the calculators of
+different spec versions built on the same graph share the work.
+"""
+
+import unittest
+from logging import debug
+
+__all__ = [
+        "NODES",
+        "CalcGraph",
+        "node"]
+
+# name -> (function, dependencies)
+NODES = {}
+
+
+def node(name, *dependencies):
+    """Register a function of (sysinfo, *dependencies) as a named node."""
+    def register(function):
+        NODES[name] = (function, dependencies)
+        return function
+    return register
+
+
+class CalcGraph:
+    """Lazily evaluated nodes of one profile"""
+    def __init__(self, sysinfo):
+        self.sysinfo = sysinfo
+        self.values = {}
+
+    def __getitem__(self, name):
+        if name not in self.values:
+            (function, dependencies) = NODES[name]
+            arguments = [self[dependency] for dependency in dependencies]
+            self.values[name] = function(self.sysinfo, *arguments)
+        return self.values[name]
+
+
+@node('basic_info')
+def basic_info(sysinfo):
+    return sysinfo.get_basic_info()
+
+
+@node('power')
+def power(sysinfo):
+    return sysinfo.get_power_consumptions()
+
+
+@node('P', 'basic_info')
+def performance_score(sysinfo, basic_info):
+    (core, clock, memory, disk) = basic_info
+    P = core * clock
+    debug("P = %s" % (P))
+    return P
+
+
+@node('display')
+def display(sysinfo):
+    """Calculation of Allowance for Enhanced-performance Integrated Displays
+
+    It is the same in Energy Star 6.0, 7.0 and 8.0."""
+    (diagonal, enhanced_performance_display) = sysinfo.get_display()
+    if enhanced_performance_display:
+        if diagonal >= 27.0:
+            EP = 0.75
+        else:
+            EP = 0.3
+    else:
+        EP = 0
+    (width, height) = sysinfo.get_resolution()
+    r = 1.0 * width * height / 1000000
+    A = 1.0 * sysinfo.get_screen_area()
+    debug("EP = %s, r = %s, A = %s" % (EP, r, A))
+    return (EP, r, A)
+
+
+@node('E_TEC 5.2', 'power')
+def e_tec_52(sysinfo, power):
+    """E_TEC weighted by the modes of Energy Star 5.2 and ErP Lot 3"""
+    (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE) = power
+    P_IDLE = P_SHORT_IDLE
+
+    if sysinfo.computer_type == 3:
+        (T_OFF, T_SLEEP, T_IDLE) = (0.6, 0.1, 0.3)
+    else:
+        (T_OFF, T_SLEEP, T_IDLE) = (0.55, 0.05, 0.4)
+
+    E_TEC = ((P_OFF * T_OFF) + (P_SLEEP * T_SLEEP) + (P_IDLE * T_IDLE)) * 8760 / 1000
+
+    debug("T_OFF = %s, T_SLEEP = %s, T_IDLE = %s" % (T_OFF, T_SLEEP, T_IDLE))
+    debug("P_OFF = %s, P_SLEEP = %s, P_IDLE = %s" % (P_OFF, P_SLEEP, P_IDLE))
+
+    return E_TEC
+
+
+@node('E_TEC 6.0', 'power')
+def e_tec_60(sysinfo, power):
+    """E_TEC weighted by the modes of Energy Star 6.0 and 7.0"""
+    (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE) = power
+    if sysinfo.product_type == 4 or sysinfo.computer_type == 3:
+        (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = (0.25, 0.35, 0.1, 0.3)
+    else:
+        (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = (0.45, 0.05, 0.15, 0.35)
+
+    E_TEC = ((P_OFF * T_OFF) + (P_SLEEP * T_SLEEP) + (P_LONG_IDLE * T_LONG_IDLE) + (P_SHORT_IDLE * T_SHORT_IDLE)) * 8760 / 1000
+
+    debug("T_OFF = %s, T_SLEEP = %s, T_LONG_IDLE = %s, T_SHORT_IDLE = %s" % (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE))
+    debug("P_OFF = %s, P_SLEEP = %s, P_LONG_IDLE = %s, P_SHORT_IDLE = %s" % (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE))
+
+    return E_TEC
+
+
+@node('E_TEC 8.0', 'power')
+def e_tec_80(sysinfo, power):
+    """E_TEC weighted by the modes of Energy Star 8.0"""
+    (p_off, p_sleep, p_long_idle, p_short_idle) = power
+    if sysinfo.product_type == 4:
+        (t_off, t_sleep, t_long_idle, t_short_idle) = \
+            (0.45, 0.05, 0.15, 0.35)
+    elif sysinfo.computer_type == 3:
+        (t_off, t_sleep, t_long_idle, t_short_idle) = \
+            (0.25, 0.35, 0.1, 0.3)
+    else:
+        (t_off, t_sleep, t_long_idle, t_short_idle) = \
+            (0.15, 0.45, 0.1, 0.3)
+
+    e_tec = ((p_off * t_off) + (p_sleep * t_sleep) +
+             (p_long_idle * t_long_idle) +
+             (p_short_idle * t_short_idle)) * 8760 / 1000
+
+    debug("T_OFF = %s, T_SLEEP = %s, T_LONG_IDLE = %s, T_SHORT_IDLE = %s" %
+          (t_off, t_sleep, t_long_idle, t_short_idle))
+    debug("P_OFF = %s, P_SLEEP = %s, P_LONG_IDLE = %s, P_SHORT_IDLE = %s" %
+          (p_off, p_sleep, p_long_idle, p_short_idle))
+
+    return e_tec
+
+
+class TestCalcGraph(unittest.TestCase):
+    class SysInfo:
+        product_type = 1
+        computer_type = 3
+
+        def __init__(self):
+            self.calls = 0
+
+        def get_power_consumptions(self):
+            self.calls = self.calls + 1
+            return (1.0, 1.7, 8.0, 10.0)
+
+    def test_once(self):
+        sysinfo = self.SysInfo()
+        graph = CalcGraph(sysinfo)
+        self.assertAlmostEqual(graph['E_TEC 5.2'], 33.0252)
+        self.assertAlmostEqual(graph['E_TEC 6.0'], 40.6902)
+        graph['E_TEC 8.0']
+        graph['E_TEC 5.2']
+        self.assertEqual(sysinfo.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,418 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Files and commands seen by the hardware probes.
+
+The probes never touch the system directly but go through host(). The
+default Host reads the live system, a RecordingHost also keeps everything
+it returns and saves it as a tarball and a ReplayHost answers from such a
+tarball in memory, so a run can be reproduced without the hardware. A
+StatsHost times every operation for the cost report of --probe-stats.
+"""
+
+import array
+import errno
+import fcntl
+import io
+import json
+import os
+import socket
+import struct
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+__all__ = [
+        "Host",
+        "RecordingHost",
+        "ReplayHost",
+        "StatsHost",
+        "host",
+        "set_host"]
+
+INDEX = 'index.json'
+
+SIOCETHTOOL = 0x8946
+ETHTOOL_GEEE = 0x44
+# struct ifreq is 40 bytes on 64-bit Linux.
+IFREQ_SIZE = 40
+
+
+class Host:
+    """The live system"""
+    def read(self, path, size=-1):
+        with open(path, 'rb') as f:
+            return f.read(size)
+
+    def read_text(self, path):
+        return self.read(path).decode('utf8', 'replace')
+
+    def listdir(self, path):
+        with os.scandir(path) as entries:
+            return [entry.name for entry in entries]
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def glob(self, root, pattern):
+        return [str(path) for path in Path(root).glob(pattern)]
+
+    def run(self, args, timeout=None):
+        """Return the output of a command without a shell."""
+        return subprocess.run(args, stdout=subprocess.PIPE, encoding='utf8',
+                              timeout=timeout, check=True).stdout
+
+    def ethtool_eee(self, dev):
+        """Return the ETHTOOL_GEEE fields of an interface.
+
+        (supported, advertised, lp_advertised, eee_active, eee_enabled) with
+        the legacy 32-bit link mode masks. Raises OSError such as
+        EOPNOTSUPP if the driver has no EEE support."""
+        # struct ethtool_eee: cmd, supported, advertised, lp_advertised,
+        # eee_active, eee_enabled, tx_lpi_enabled, tx_lpi_timer, reserved[2]
+        eee = array.array('I', [ETHTOOL_GEEE] + [0] * 9)
+        ifreq = struct.pack('16sP', dev.encode('utf8'), eee.buffer_info()[0])
+        ifreq = ifreq + bytes(IFREQ_SIZE - len(ifreq))
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            fcntl.ioctl(sock.fileno(), SIOCETHTOOL, ifreq)
+        return tuple(eee[1:6])
+
+
+def _error(err):
+    if isinstance(err, subprocess.TimeoutExpired):
+        return {'timeout': err.timeout}
+    if isinstance(err, subprocess.CalledProcessError):
+        return {'returncode': err.returncode, 'output': err.output}
+    return {'errno': err.errno, 'strerror': err.strerror}
+
+
+def _raise(error, name):
+    if 'timeout' in error:
+        raise subprocess.TimeoutExpired(name, error['timeout'])
+    if 'returncode' in error:
+        raise subprocess.CalledProcessError(error['returncode'], name,
+                                            error['output'])
+    # OSError picks the subclass of the errno, such as PermissionError.
+    raise OSError(error['errno'], error['strerror'], name)
+
+
+class RecordingHost(Host):
+    """The live system recording every answer"""
+    def __init__(self, live=None):
+        self.live = live or Host()
+        self.lock = threading.Lock()
+        self.files = {}
+        self.index = {'read': {}, 'listdir': {}, 'exists': {}, 'glob': {},
+                      'run': {}, 'ethtool_eee': {}}
+
+    def _record(self, kind, key, function):
+        try:
+            value = function()
+        except (OSError, subprocess.SubprocessError) as err:
+            with self.lock:
+                self.index[kind][key] = {'error': _error(err)}
+            raise err
+        with self.lock:
+            if kind == 'read':
+                # Keep the longest read of a file.
+                if len(value) >= len(self.files.get(key, b'')):
+                    self.files[key] = value
+                self.index[kind][key] = {}
+            elif isinstance(value, tuple):
+                self.index[kind][key] = {'value': list(value)}
+            else:
+                self.index[kind][key] = {'value': value}
+        return value
+
+    def read(self, path, size=-1):
+        return self._record('read', str(path),
+                            lambda: self.live.read(path, size))
+
+    def listdir(self, path):
+        return self._record('listdir', str(path),
+                            lambda: self.live.listdir(path))
+
+    def exists(self, path):
+        return self._record('exists', str(path),
+                            lambda: self.live.exists(path))
+
+    def glob(self, root, pattern):
+        return self._record('glob', str(root) + '\0' + pattern,
+                            lambda: self.live.glob(root, pattern))
+
+    def run(self, args, timeout=None):
+        return self._record('run', json.dumps(args),
+                            lambda: self.live.run(args, timeout))
+
+    def ethtool_eee(self, dev):
+        return self._record('ethtool_eee', dev,
+                            lambda: self.live.ethtool_eee(dev))
+
+    def save(self, filename):
+        """Save everything recorded as a gzipped tarball."""
+        with self.lock:
+            index = json.dumps(self.index, sort_keys=True).encode('utf8')
+            files = dict(self.files)
+        with tarfile.open(filename, 'w:gz') as tar:
+            members = [(INDEX, index)] + \
+                [('fs' + path, content)
+                 for path, content in sorted(files.items())]
+            for name, content in members:
+                member = tarfile.TarInfo(name)
+                member.size = len(content)
+                tar.addfile(member, io.BytesIO(content))
+
+
+class ReplayHost(Host):
+    """A recorded system answered from memory"""
+    def __init__(self, index, files):
+        self.index = index
+        self.files = files
+
+    @classmethod
+    def load(cls, filename):
+        files = {}
+        index = None
+        with tarfile.open(filename, 'r:*') as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                content = tar.extractfile(member).read()
+                if member.name == INDEX:
+                    index = json.loads(content.decode('utf8'))
+                elif member.name.startswith('fs/'):
+                    files[member.name[2:]] = content
+        if index is None:
+            raise ValueError("%s is not a probe recording." % filename)
+        return cls(index, files)
+
+    def _answer(self, kind, key, name):
+        if key not in self.index.get(kind, {}):
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT),
+                                    name)
+        record = self.index[kind][key]
+        if 'error' in record:
+            _raise(record['error'], name)
+        return record.get('value')
+
+    def read(self, path, size=-1):
+        self._answer('read', str(path), str(path))
+        content = self.files[str(path)]
+        return content if size < 0 else content[:size]
+
+    def listdir(self, path):
+        return list(self._answer('listdir', str(path), str(path)))
+
+    def exists(self, path):
+        if str(path) in self.index['exists']:
+            return self._answer('exists', str(path), str(path))
+        return str(path) in self.files or str(path) in self.index['listdir']
+
+    def glob(self, root, pattern):
+        key = str(root) + '\0' + pattern
+        if key not in self.index['glob']:
+            return []
+        return list(self._answer('glob', key, str(root)))
+
+    def run(self, args, timeout=None):
+        return self._answer('run', json.dumps(args), args)
+
+    def ethtool_eee(self, dev):
+        if dev not in self.index.get('ethtool_eee', {}):
+            raise OSError(errno.ENODEV, os.strerror(errno.ENODEV), dev)
+        return tuple(self._answer('ethtool_eee', dev, dev))
+
+
+def _probe_name():
+    """Return the probe of the current thread, probe-edid -> edid."""
+    name = threading.current_thread().name
+    if not name.startswith('probe-'):
+        return 'main'
+    # The worker threads of a probe are named like probe-ethernet_0.
+    return name[len('probe-'):].split('_')[0]
+
+
+class StatsHost(Host):
+    """Another host timing every operation"""
+    def __init__(self, live=None):
+        self.live = live or Host()
+        self.lock = threading.Lock()
+        self.start = time.monotonic()
+        self.operations = []
+
+    def _time(self, kind, target, function, size=len):
+        operation = {'probe': _probe_name(), 'operation': kind,
+                     'target': target, 'result': 'pending',
+                     'started': time.monotonic()}
+        with self.lock:
+            self.operations.append(operation)
+        try:
+            value = function()
+        except Exception as err:
+            operation['result'] = type(err).__name__
+            raise err
+        finally:
+            operation['seconds'] = time.monotonic() - operation['started']
+        operation['result'] = 'ok'
+        if size is not None:
+            operation['size'] = size(value)
+        return value
+
+    def read(self, path, size=-1):
+        return self._time('read', str(path),
+                          lambda: self.live.read(path, size))
+
+    def listdir(self, path):
+        return self._time('listdir', str(path),
+                          lambda: self.live.listdir(path))
+
+    def exists(self, path):
+        return self._time('exists', str(path),
+                          lambda: self.live.exists(path), size=None)
+
+    def glob(self, root, pattern):
+        return self._time('glob', os.path.join(str(root), pattern),
+                          lambda: self.live.glob(root, pattern))
+
+    def run(self, args, timeout=None):
+        return self._time('run', ' '.join(args),
+                          lambda: self.live.run(args, timeout))
+
+    def ethtool_eee(self, dev):
+        return self._time('ioctl', 'ETHTOOL_GEEE ' + dev,
+                          lambda: self.live.ethtool_eee(dev), size=None)
+
+    def report(self):
+        """Return the cost report as a dict.
+
+        The probes are sorted by their total time. The size is the number
+        of bytes read or printed, or the number of entries listed. An
+        operation still running is 'pending' with the time so far."""
+        now = time.monotonic()
+        with self.lock:
+            operations = [dict(operation) for operation in self.operations]
+        probes = {}
+        for operation in operations:
+            started = operation.pop('started')
+            if 'seconds' not in operation:
+                operation['seconds'] = now - started
+            operation['start'] = started - self.start
+            total = probes.setdefault(operation['probe'], {
+                'operations': 0, 'seconds': 0.0, 'size': 0})
+            total['operations'] = total['operations'] + 1
+            total['seconds'] = total['seconds'] + operation['seconds']
+            total['size'] = total['size'] + operation.get('size', 0)
+        return {'seconds': now - self.start,
+                'probes': dict(sorted(probes.items(),
+                                      key=lambda item: -item[1]['seconds'])),
+                'operations': operations}
+
+    def save(self, filename):
+        with open(filename, 'w') as data:
+            data.write(json.dumps(self.report(), indent=4) + '\n')
+
+
+_host = Host()
+
+
+def host():
+    """Return the Host used by the probes."""
+    return _host
+
+
+def set_host(new):
+    """Use another Host for the probes and return the previous one."""
+    global _host
+    (previous, _host) = (_host, new)
+    return previous
+
+
+class TestReplayHost(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = os.path.join(tmpdir, 'root')
+            os.makedirs(os.path.join(root, 'a'))
+            with open(os.path.join(root, 'a', 'b'), 'wb') as f:
+                f.write(b'\x00\x01binary')
+            recorder = RecordingHost()
+            self.assertEqual(recorder.read(os.path.join(root, 'a', 'b'), 2),
+                             b'\x00\x01')
+            self.assertEqual(recorder.listdir(root), ['a'])
+            self.assertTrue(recorder.exists(os.path.join(root, 'a')))
+            self.assertEqual(recorder.glob(root, '*/b'),
+                             [os.path.join(root, 'a', 'b')])
+            self.assertEqual(recorder.run(['echo', 'hello']), 'hello\n')
+            with self.assertRaises(FileNotFoundError):
+                recorder.read(os.path.join(root, 'missing'))
+            with self.assertRaises(subprocess.CalledProcessError):
+                recorder.run(['false'])
+            tarball = os.path.join(tmpdir, 'probe.tar.gz')
+            recorder.save(tarball)
+            replay = ReplayHost.load(tarball)
+
+        self.assertEqual(replay.read(os.path.join(root, 'a', 'b')),
+                         b'\x00\x01')
+        self.assertEqual(replay.listdir(root), ['a'])
+        self.assertTrue(replay.exists(os.path.join(root, 'a')))
+        self.assertFalse(replay.exists(os.path.join(root, 'c')))
+        self.assertEqual(replay.glob(root, '*/b'),
+                         [os.path.join(root, 'a', 'b')])
+        self.assertEqual(replay.run(['echo', 'hello']), 'hello\n')
+        with self.assertRaises(FileNotFoundError):
+            replay.read(os.path.join(root, 'missing'))
+        with self.assertRaises(subprocess.CalledProcessError):
+            replay.run(['false'])
+        with self.assertRaises(FileNotFoundError):
+            replay.run(['ethtool'])
+        with self.assertRaises(OSError):
+            replay.ethtool_eee('eth0')
+
+    def test_stats(self):
+        stats = StatsHost()
+        thread = threading.Thread(target=stats.read, args=(__file__,),
+                                  name='probe-test')
+        thread.start()
+        thread.join()
+        with self.assertRaises(FileNotFoundError):
+            stats.listdir('/nonexistent')
+        report = stats.report()
+        self.assertEqual(set(report['probes']), {'test', 'main'})
+        self.assertEqual(report['probes']['main']['operations'], 1)
+        (read, listdir) = report['operations']
+        self.assertEqual((read['probe'], read['operation'], read['result']),
+                         ('test', 'read', 'ok'))
+        self.assertEqual(read['size'], os.path.getsize(__file__))
+        self.assertEqual(listdir['result'], 'FileNotFoundError')
+        json.dumps(report)
+
+    def test_set_host(self):
+        replay = ReplayHost({'read': {}}, {})
+        previous = set_host(replay)
+        try:
+            self.assertIs(host(), replay)
+        finally:
+            set_host(previous)
+        self.assertIs(host(), previous)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Concurrent hardware probes with a deadline each.
+
+A probe is a named function without arguments which reads the hardware and
+never asks anything. A Prober runs its probes concurrently on an asyncio
+loop, every probe in its own daemon thread, so a hung probe only costs its
+own deadline and never blocks the exit of the program. Prober.start() runs
+them in the background while the questions are answered and result()
+only waits for the probe it asks for.
+"""
+
+import asyncio
+import copy
+import threading
+import time
+import unittest
+from logging import debug
+
+__all__ = [
+        "PROBES",
+        "ProbeError",
+        "Prober",
+        "probe"]
+
+PROBE_TIMEOUT = 10
+
+# name -> (function, timeout)
+PROBES = {}
+
+
+def probe(name, timeout=PROBE_TIMEOUT):
+    """Register a function without arguments as a named probe."""
+    def register(function):
+        PROBES[name] = (function, timeout)
+        return function
+    return register
+
+
+class ProbeError(Exception):
+    """A probe which timed out or failed
+
+    The reason is 'timeout' or 'failed' and the cause is the exception
+    raised by the probe if any."""
+    def __init__(self, name, reason, cause=None, timeout=None):
+        self.name = name
+        self.reason = reason
+        self.cause = cause
+        self.timeout = timeout
+        super().__init__(name, reason, cause, timeout)
+
+    def __str__(self):
+        if self.reason == 'timeout':
+            return "Probe '%s' timed out after %s seconds." % (self.name,
+                                                               self.timeout)
+        return "Probe '%s' failed: %s" % (self.name, self.cause)
+
+
+def _resolve(loop, future, value, exception):
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(value)
+
+
+def _in_thread(loop, name, function):
+    """Run function in a daemon thread and return an asyncio future."""
+    future = loop.create_future()
+
+    def target():
+        (value, exception) = (None, None)
+        try:
+            value = function()
+        except Exception as err:
+            exception = err
+        try:
+            loop.call_soon_threadsafe(_resolve, loop, future, value,
+                                      exception)
+        except RuntimeError:
+            # The loop is closed after the deadline.
+            pass
+
+    threading.Thread(target=target, name='probe-' + name,
+                     daemon=True).start()
+    return future
+
+
+class Prober:
+    """Results of the probes run concurrently"""
+    def __init__(self, names=None, probes=None):
+        self.probes = PROBES if probes is None else probes
+        self.names = list(self.probes if names is None else names)
+        self.results = {}
+        self.thread = None
+        self._condition = threading.Condition()
+
+    def __getstate__(self):
+        self.wait()
+        state = dict(self.__dict__)
+        state['thread'] = None
+        state['_condition'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._condition = threading.Condition()
+
+    async def _run_one(self, name):
+        (function, timeout) = self.probes[name]
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        try:
+            value = await asyncio.wait_for(
+                _in_thread(loop, name, function), timeout)
+        except asyncio.TimeoutError:
+            value = ProbeError(name, 'timeout', timeout=timeout)
+        except Exception as err:
+            value = ProbeError(name, 'failed', err)
+        debug("Probe %s: %.3f seconds" % (name, time.monotonic() - start))
+        with self._condition:
+            self.results[name] = value
+            self._condition.notify_all()
+
+    def _run_more(self, name):
+        results = Prober([name], self.probes).run().results
+        with self._condition:
+            self.results.update(results)
+            self._condition.notify_all()
+
+    async def _run_all(self):
+        await asyncio.gather(*(self._run_one(name) for name in self.names))
+
+    def run(self):
+        """Run all probes and return self."""
+        asyncio.run(self._run_all())
+        return self
+
+    def start(self, done=None):
+        """Run all probes in a background thread and return self.
+
+        done is called with the prober after all probes finish."""
+        def target():
+            self.run()
+            if done:
+                done(self)
+
+        self.thread = threading.Thread(target=target, name='prober',
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    @classmethod
+    def cached(cls, results, probes=None):
+        """Return a prober with the results of an earlier run."""
+        prober = cls(list(results), probes)
+        prober.results = dict(results)
+        return prober
+
+    def wait(self):
+        """Wait for all probes started by start()."""
+        if self.thread is not None:
+            self.thread.join()
+
+    def result(self, name):
+        """Return the value of a probe or raise its ProbeError.
+
+        A probe which is not one of the names is run first."""
+        if name not in self.names:
+            self.names.append(name)
+            self._run_more(name)
+        with self._condition:
+            self._condition.wait_for(lambda: name in self.results)
+            value = self.results[name]
+        if isinstance(value, ProbeError):
+            raise value
+        return value
+
+
+class TestProber(unittest.TestCase):
+    def setUp(self):
+        def sleep(seconds):
+            def function():
+                time.sleep(seconds)
+                return seconds
+            return function
+
+        def fail():
+            raise PermissionError('denied')
+
+        self.probes = {'a': (sleep(0.2), 1),
+                       'b': (sleep(0.2), 1),
+                       'hung': (sleep(10), 0.3),
+                       'fail': (fail, 1)}
+
+    def test_concurrent(self):
+        start = time.monotonic()
+        prober = Prober(probes=self.probes).run()
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(prober.result('a'), 0.2)
+        self.assertEqual(prober.result('b'), 0.2)
+        with self.assertRaises(ProbeError) as cm:
+            prober.result('hung')
+        self.assertEqual(cm.exception.reason, 'timeout')
+        with self.assertRaises(ProbeError) as cm:
+            prober.result('fail')
+        self.assertEqual(cm.exception.reason, 'failed')
+        self.assertIsInstance(cm.exception.cause, PermissionError)
+
+    def test_start(self):
+        start = time.monotonic()
+        prober = Prober(['a', 'hung'], probes=self.probes).start()
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(prober.result('a'), 0.2)
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(prober.result('b'), 0.2)
+        prober.wait()
+        self.assertEqual(prober.results['hung'].reason, 'timeout')
+        copied = copy.deepcopy(prober)
+        self.assertEqual(copied.result('a'), 0.2)
+        self.assertEqual(str(copied.results['hung']),
+                         "Probe 'hung' timed out after 0.3 seconds.")
+
+    def test_cached(self):
+        results = []
+        prober = Prober(['a', 'fail'], probes=self.probes).start(
+            done=lambda prober: results.append(dict(prober.results)))
+        prober.wait()
+        cached = Prober.cached(results[0], probes=self.probes)
+        self.assertEqual(cached.result('a'), 0.2)
+        self.assertRaises(ProbeError, cached.result, 'fail')
+
+    def test_names(self):
+        prober = Prober(['fail'], probes=self.probes).run()
+        self.assertEqual(list(prober.results), ['fail'])
+
+
+if __name__ == '__main__':
+    unittest.main()
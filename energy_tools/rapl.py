@@ -0,0 +1,205 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Package power estimated by the RAPL energy counters of the processor.
+
+It is only the power of the processor packages reported by the processor
+itself, not the power of the system at the wall, so it is only good for a
+quick pre-screening of the idle power and never replaces a power meter.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from array import array
+from collections import namedtuple
+
+__all__ = [
+        "RaplSampler",
+        "package_domains"]
+
+POWERCAP = '/sys/class/powercap'
+
+Domain = namedtuple('Domain', ['path', 'max_energy_range'])
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+
+def package_domains(powercap=POWERCAP):
+    """Return the Domain of every processor package.
+
+    intel-rapl:0 is a package and intel-rapl:0:0 one of its subdomains."""
+    domains = []
+    try:
+        names = sorted(os.listdir(powercap))
+    except OSError:
+        return domains
+    for name in names:
+        if not name.startswith('intel-rapl:') or name.count(':') != 1:
+            continue
+        path = os.path.join(powercap, name)
+        try:
+            if not _read(os.path.join(path, 'name')).startswith('package'):
+                continue
+            max_energy_range = int(_read(os.path.join(
+                path, 'max_energy_range_uj')))
+        except (OSError, ValueError):
+            continue
+        domains.append(Domain(path, max_energy_range))
+    return domains
+
+
+class RaplSampler:
+    """Package power samples in a ring buffer
+
+    The samples are the mean power in W between two readings of the energy
+    counters of all packages. The ring buffer keeps the samples of the last
+    window seconds at the given rate in Hz."""
+    def __init__(self, powercap=POWERCAP, rate=10, window=10,
+                 clock=time.monotonic):
+        self.domains = package_domains(powercap)
+        self.rate = rate
+        self.clock = clock
+        self.samples = array('d', bytes(8 * max(int(window * rate), 1)))
+        self.index = 0
+        self.count = 0
+        self.last = None
+
+    def _energies(self):
+        return [int(_read(os.path.join(domain.path, 'energy_uj')))
+                for domain in self.domains]
+
+    def sample(self):
+        """Read the counters and return the power since the last reading.
+
+        None for the first reading."""
+        now = self.clock()
+        energies = self._energies()
+        last = self.last
+        self.last = (now, energies)
+        if last is None or now <= last[0]:
+            return None
+        energy = 0
+        for domain, before, after in zip(self.domains, last[1], energies):
+            if after < before:
+                # The counter wrapped around max_energy_range_uj.
+                after = after + domain.max_energy_range
+            energy = energy + after - before
+        watts = energy / 1000000 / (now - last[0])
+        self.samples[self.index] = watts
+        self.index = (self.index + 1) % len(self.samples)
+        self.count = min(self.count + 1, len(self.samples))
+        return watts
+
+    def run(self, seconds, sleep=time.sleep):
+        """Sample for the given seconds at the rate."""
+        start = self.clock()
+        self.sample()
+        for i in range(1, int(seconds * self.rate) + 1):
+            delay = start + i / self.rate - self.clock()
+            if delay > 0:
+                sleep(delay)
+            self.sample()
+
+    def mean(self, seconds=None):
+        """Return the mean power of the last seconds or None."""
+        count = self.count
+        if seconds is not None:
+            count = min(count, max(int(seconds * self.rate), 1))
+        if count == 0:
+            return None
+        total = 0.0
+        for i in range(1, count + 1):
+            total = total + self.samples[(self.index - i) % len(self.samples)]
+        return total / count
+
+
+class TestRaplSampler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.powercap = self.tmpdir.name
+        for name, domain in (('intel-rapl', None),
+                             ('intel-rapl:0', 'package-0'),
+                             ('intel-rapl:0:0', 'core'),
+                             ('intel-rapl:1', 'package-1'),
+                             ('intel-rapl:2', 'psys')):
+            os.mkdir(os.path.join(self.powercap, name))
+            if domain:
+                self.write(name, 'name', domain)
+                self.write(name, 'max_energy_range_uj', '262143328850')
+                self.write(name, 'energy_uj', '0')
+        self.now = 0.0
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, filename, value):
+        with open(os.path.join(self.powercap, name, filename), 'w') as f:
+            f.write(value + '\n')
+
+    def test_domains(self):
+        self.assertEqual([os.path.basename(domain.path) for domain in
+                          package_domains(self.powercap)],
+                         ['intel-rapl:0', 'intel-rapl:1'])
+        self.assertEqual(package_domains(os.path.join(self.powercap, 'x')),
+                         [])
+
+    def test_sample(self):
+        sampler = RaplSampler(self.powercap, rate=2, window=2,
+                              clock=lambda: self.now)
+        self.assertIsNone(sampler.sample())
+        self.assertIsNone(sampler.mean())
+        energy = 0
+        for watts in (4.0, 6.0, 8.0, 10.0, 12.0):
+            self.now = self.now + 0.5
+            energy = energy + int(watts / 2 * 1000000)
+            self.write('intel-rapl:0', 'energy_uj', str(energy))
+            self.assertAlmostEqual(sampler.sample(), watts)
+        # The ring buffer keeps the last 4 samples.
+        self.assertAlmostEqual(sampler.mean(), 9.0)
+        self.assertAlmostEqual(sampler.mean(1), 11.0)
+
+    def test_wraparound(self):
+        sampler = RaplSampler(self.powercap, rate=1, window=1,
+                              clock=lambda: self.now)
+        self.write('intel-rapl:1', 'energy_uj', '262142328850')
+        sampler.sample()
+        self.now = 1.0
+        self.write('intel-rapl:1', 'energy_uj', '2000000')
+        self.assertAlmostEqual(sampler.sample(), 3.0)
+
+    def test_run(self):
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            self.now = self.now + seconds
+
+        sampler = RaplSampler(self.powercap, rate=4, window=1,
+                              clock=lambda: self.now)
+        sampler.run(1, sleep=sleep)
+        self.assertEqual(sleeps, [0.25] * 4)
+        self.assertEqual(sampler.mean(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,717 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Side-effect-free evaluation of a profile.
+
+The calculators add their lines of text and a Result record for every
+comparison to a Report. Nothing here prints to the console or touches the
+filesystem; core.py renders the Report of a run and evaluate() only returns
+its Result records.
+"""
+
+import json
+import unittest
+from logging import debug
+from .energystar52 import EnergyStar52
+from .energystar60 import EnergyStar60
+from .energystar70 import EnergyStar70
+from .energystar80 import EnergyStar80
+from .erplot3 import ErPLot3
+from .erplot26 import ErPLot26
+from .common import Report, Result, compare, result_filter
+from .graph import CalcGraph
+from .sysinfo import SysInfo
+
+__all__ = [
+        "Result",
+        "energystar_calculate",
+        "erplot26_calculate",
+        "erplot3_calculate",
+        "evaluate",
+        "evaluate_sysinfo"]
+
+
+def calculate_product_type1_estar5(sysinfo, report, graph=None):
+    report.add("Energy Star 5:")
+    estar52 = EnergyStar52(sysinfo, graph)
+    E_TEC = estar52.equation_one()
+
+    over_128 = estar52.equation_two(True, True)
+    between_64_and_128 = estar52.equation_two(False, True)
+    under_64 = estar52.equation_two(False, False)
+    debug(over_128)
+    debug(between_64_and_128)
+    debug(under_64)
+    different=False
+
+    for i,j,k in zip(over_128, between_64_and_128, under_64):
+        (cat1, max1) = i
+        (cat2, max2) = j
+        (cat3, max3) = k
+        if cat1 != cat2 or max1 != max2 or cat2 != cat3 or max2 != max3:
+            different=True
+    else:
+        if different is True:
+            if sysinfo.computer_type == 3:
+                report.add("\n  If GPU Frame Buffer Width <= 64 bits,")
+                for i in under_64:
+                    (category, E_TEC_MAX) = i
+                    if E_TEC <= E_TEC_MAX:
+                        result = 'PASS'
+                        operator = '<='
+                    else:
+                        result = 'FAIL'
+                        operator = '>'
+                    report.add("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                               compare('Energy Star 5.2', 'Category %s, FB_W <= 64' % category, E_TEC, E_TEC_MAX))
+                report.add("\n  If 64 bits < GPU Frame Buffer Width <= 128 bits,")
+                for i in between_64_and_128:
+                    (category, E_TEC_MAX) = i
+                    if E_TEC <= E_TEC_MAX:
+                        result = 'PASS'
+                        operator = '<='
+                    else:
+                        result = 'FAIL'
+                        operator = '>'
+                    report.add("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                               compare('Energy Star 5.2', 'Category %s, 64 < FB_W <= 128' % category, E_TEC, E_TEC_MAX))
+            else:
+                report.add("\n  If GPU Frame Buffer Width <= 128 bits,")
+                for i in between_64_and_128:
+                    (category, E_TEC_MAX) = i
+                    if E_TEC <= E_TEC_MAX:
+                        result = 'PASS'
+                        operator = '<='
+                    else:
+                        result = 'FAIL'
+                        operator = '>'
+                    report.add("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                               compare('Energy Star 5.2', 'Category %s, FB_W <= 128' % category, E_TEC, E_TEC_MAX))
+            report.add("\n  If GPU Frame Buffer Width > 128 bits,")
+            for i in over_128:
+                (category, E_TEC_MAX) = i
+                if E_TEC <= E_TEC_MAX:
+                    result = 'PASS'
+                    operator = '<='
+                else:
+                    result = 'FAIL'
+                    operator = '>'
+                report.add("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                           compare('Energy Star 5.2', 'Category %s, FB_W > 128' % category, E_TEC, E_TEC_MAX))
+        else:
+            for i in under_64:
+                (category, E_TEC_MAX) = i
+                if E_TEC <= E_TEC_MAX:
+                    result = 'PASS'
+                    operator = '<='
+                else:
+                    result = 'FAIL'
+                    operator = '>'
+                report.add("\n  Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                           compare('Energy Star 5.2', 'Category %s' % category, E_TEC, E_TEC_MAX))
+
+
+def calculate_product_type1_estar6(sysinfo, report, graph=None):
+    report.add("\nEnergy Star 6:\n")
+    estar60 = EnergyStar60(sysinfo, graph)
+    E_TEC = estar60.equation_one()
+
+    lower = 1.015
+    if sysinfo.computer_type == 2:
+        higher = 1.04
+    else:
+        higher = 1.03
+
+    for psu, AllowancePSU in (('PSU none', 1), ('PSU lower', lower), ('PSU higher', higher)):
+        if sysinfo.discrete:
+            if AllowancePSU == 1:
+                report.add("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
+            elif AllowancePSU == lower:
+                report.add("  If power supplies meet lower efficiency requirements,")
+            elif AllowancePSU == higher:
+                report.add("  If power supplies meet higher efficiency requirements,")
+            for gpu in ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7'):
+                E_TEC_MAX = estar60.equation_two(gpu) * AllowancePSU
+                if E_TEC <= E_TEC_MAX:
+                    result = 'PASS'
+                    operator = '<='
+                else:
+                    result = 'FAIL'
+                    operator = '>'
+                if gpu == 'G1':
+                    gpu = "G1 (FB_BW <= 16)"
+                elif gpu == 'G2':
+                    gpu = "G2 (16 < FB_BW <= 32)"
+                elif gpu == 'G3':
+                    gpu = "G3 (32 < FB_BW <= 64)"
+                elif gpu == 'G4':
+                    gpu = "G4 (64 < FB_BW <= 96)"
+                elif gpu == 'G5':
+                    gpu = "G5 (96 < FB_BW <= 128)"
+                elif gpu == 'G6':
+                    gpu = "G6 (FB_BW > 128; Frame Buffer Data Width < 192 bits)"
+                elif gpu == 'G7':
+                    gpu = "G7 (FB_BW > 128; Frame Buffer Data Width >= 192 bits)"
+                report.add("    %s (E_TEC) %s %s (E_TEC_MAX) for %s, %s" % (E_TEC, operator, E_TEC_MAX, gpu, result_filter(result, E_TEC, E_TEC_MAX)),
+                           compare('Energy Star 6.0', gpu[:2] + ', ' + psu, E_TEC, E_TEC_MAX))
+        else:
+            if AllowancePSU == 1:
+                report.add("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
+            elif AllowancePSU == lower:
+                report.add("  If power supplies meet lower efficiency requirements,")
+            elif AllowancePSU == higher:
+                report.add("  If power supplies meet higher efficiency requirements,")
+            E_TEC_MAX = estar60.equation_two('G1') * AllowancePSU
+            if E_TEC <= E_TEC_MAX:
+                result = 'PASS'
+                operator = '<='
+            else:
+                result = 'FAIL'
+                operator = '>'
+            report.add("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                       compare('Energy Star 6.0', psu, E_TEC, E_TEC_MAX))
+
+
+def calculate_product_type1_estar7(sysinfo, report, graph=None):
+    report.add("\nEnergy Star 7:\n")
+    estar70 = EnergyStar70(sysinfo, graph)
+    E_TEC = estar70.equation_one()
+
+    lower = 1.015
+    if sysinfo.computer_type == 2:
+        higher = 1.04
+    else:
+        higher = 1.03
+
+    if sysinfo.computer_type == 1 or sysinfo.computer_type == 2:
+        for psu, AllowancePSU in (('PSU none', 1), ('PSU lower', lower), ('PSU higher', higher)):
+            if sysinfo.discrete:
+                if AllowancePSU == 1:
+                    report.add("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
+                elif AllowancePSU == lower:
+                    report.add("  If power supplies meet lower efficiency requirements,")
+                elif AllowancePSU == higher:
+                    report.add("  If power supplies meet higher efficiency requirements,")
+                for gpu in ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7'):
+                    E_TEC_MAX = estar70.equation_two(gpu) * AllowancePSU
+                    if E_TEC <= E_TEC_MAX:
+                        result = 'PASS'
+                        operator = '<='
+                    else:
+                        result = 'FAIL'
+                        operator = '>'
+                    if gpu == 'G1':
+                        gpu = "G1 (FB_BW <= 16)"
+                    elif gpu == 'G2':
+                        gpu = "G2 (16 < FB_BW <= 32)"
+                    elif gpu == 'G3':
+                        gpu = "G3 (32 < FB_BW <= 64)"
+                    elif gpu == 'G4':
+                        gpu = "G4 (64 < FB_BW <= 96)"
+                    elif gpu == 'G5':
+                        gpu = "G5 (96 < FB_BW <= 128)"
+                    elif gpu == 'G6':
+                        gpu = "G6 (FB_BW > 128; Frame Buffer Data Width < 192 bits)"
+                    elif gpu == 'G7':
+                        gpu = "G7 (FB_BW > 128; Frame Buffer Data Width >= 192 bits)"
+                    report.add("    %s (E_TEC) %s %s (E_TEC_MAX) for %s, %s" % (E_TEC, operator, E_TEC_MAX, gpu, result_filter(result, E_TEC, E_TEC_MAX)),
+                               compare('Energy Star 7.0', gpu[:2] + ', ' + psu, E_TEC, E_TEC_MAX))
+            else:
+                if AllowancePSU == 1:
+                    report.add("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
+                elif AllowancePSU == lower:
+                    report.add("  If power supplies meet lower efficiency requirements,")
+                elif AllowancePSU == higher:
+                    report.add("  If power supplies meet higher efficiency requirements,")
+                E_TEC_MAX = estar70.equation_two('G1') * AllowancePSU
+                if E_TEC <= E_TEC_MAX:
+                    result = 'PASS'
+                    operator = '<='
+                else:
+                    result = 'FAIL'
+                    operator = '>'
+                report.add("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                           compare('Energy Star 7.0', psu, E_TEC, E_TEC_MAX))
+    else:
+        if sysinfo.discrete:
+            E_TEC_MAX = estar70.equation_two('N/A', sysinfo.fb_bw)
+            if E_TEC <= E_TEC_MAX:
+                result = 'PASS'
+                operator = '<='
+            else:
+                result = 'FAIL'
+                operator = '>'
+            report.add("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                       compare('Energy Star 7.0', 'FB_BW %s' % sysinfo.fb_bw, E_TEC, E_TEC_MAX))
+        else:
+            E_TEC_MAX = estar70.equation_two('G1')
+            if E_TEC <= E_TEC_MAX:
+                result = 'PASS'
+                operator = '<='
+            else:
+                result = 'FAIL'
+                operator = '>'
+            report.add("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                       compare('Energy Star 7.0', 'Integrated Graphics', E_TEC, E_TEC_MAX))
+    return report
+
+
+def calculate_product_type1_estar8(sysinfo, report, graph=None):
+    """Calculate Energy Star 8"""
+    report.add("\nEnergy Star 8:\n")
+    estar80 = EnergyStar80(sysinfo, graph)
+    e_tec = estar80.equation_one()
+    fb_bw = sysinfo.fb_bw
+
+    lower = 0.015
+
+    if sysinfo.computer_type == 1:
+        higher = 0.03
+        for proxy, allowance_proxy in (('no proxy', 0), ('full network proxy', 0.12)):
+            if allowance_proxy == 0:
+                report.add("  If the desktop computer doesn't implement a full capability - full network proxy solution,")
+            elif allowance_proxy == 0.12:
+                report.add("  If the desktop computer implements a full capability - full network proxy solution,")
+            for psu, allowance_psu in (('PSU none', 0), ('PSU lower', lower), ('PSU higher', higher)):
+                if allowance_psu == 0:
+                    report.add("   If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
+                elif allowance_psu == lower:
+                    report.add("   If power supplies meet lower efficiency requirements,")
+                elif allowance_psu == higher:
+                    report.add("   If power supplies meet higher efficiency requirements,")
+                e_tec_max = estar80.equation_two(fb_bw) * (1 + allowance_psu + allowance_proxy)
+                if e_tec <= e_tec_max:
+                    result = 'PASS'
+                    operator = '<='
+                else:
+                    result = 'FAIL'
+                    operator = '>'
+                report.add("     %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)),
+                           compare('Energy Star 8.0', proxy + ', ' + psu, e_tec, e_tec_max))
+    elif sysinfo.computer_type == 2:
+        higher = 0.04
+        for psu, allowance_psu in (('PSU none', 0), ('PSU lower', lower), ('PSU higher', higher)):
+            if allowance_psu == 0:
+                report.add("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
+            elif allowance_psu == lower:
+                report.add("  If power supplies meet lower efficiency requirements,")
+            elif allowance_psu == higher:
+                report.add("  If power supplies meet higher efficiency requirements,")
+            e_tec_max = estar80.equation_two(fb_bw) * (1 + allowance_psu)
+            if e_tec <= e_tec_max:
+                result = 'PASS'
+                operator = '<='
+            else:
+                result = 'FAIL'
+                operator = '>'
+            report.add("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)),
+                       compare('Energy Star 8.0', psu, e_tec, e_tec_max))
+    else:
+        report.add("  If the system doesn't meet the full Mobile Workstation definition,")
+        e_tec_max = estar80.equation_two(fb_bw, False)
+        if e_tec <= e_tec_max:
+            result = 'PASS'
+            operator = '<='
+        else:
+            result = 'FAIL'
+            operator = '>'
+        report.add("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)),
+                   compare('Energy Star 8.0', 'Notebook', e_tec, e_tec_max))
+
+        report.add("  If the system meets the full Mobile Workstation definition,")
+        e_tec_max = estar80.equation_two(fb_bw, True)
+        if e_tec <= e_tec_max:
+            result = 'PASS'
+            operator = '<='
+        else:
+            result = 'FAIL'
+            operator = '>'
+        report.add("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)),
+                   compare('Energy Star 8.0', 'Mobile Workstation', e_tec, e_tec_max))
+    return report
+
+
+def energystar_calculate(sysinfo, report, graph=None):
+    if graph is None:
+        graph = CalcGraph(sysinfo)
+    # The part of the results which goes into the report file.
+    output = Report()
+    if sysinfo.product_type == 1:
+        calculate_product_type1_estar5(sysinfo, report, graph)
+        calculate_product_type1_estar6(sysinfo, report, graph)
+        # Only Energy Star 7 and 8 go into the report file.
+        calculate_product_type1_estar7(sysinfo, output, graph)
+        calculate_product_type1_estar8(sysinfo, output, graph)
+    elif sysinfo.product_type == 2:
+        # Energy Star 5.2
+        output.add("Energy Star 5.2:")
+        estar52 = EnergyStar52(sysinfo, graph)
+        P_TEC = estar52.equation_three()
+        P_TEC_MAX = estar52.equation_four()
+        if P_TEC <= P_TEC_MAX:
+            result = 'PASS'
+            operator = '<='
+        else:
+            result = 'FAIL'
+            operator = '>'
+        output.add("  %s (P_TEC) %s %s (P_TEC_MAX), %s" % (P_TEC, operator, P_TEC_MAX, result_filter(result, P_TEC, P_TEC_MAX)),
+                   compare('Energy Star 5.2', 'P_TEC', P_TEC, P_TEC_MAX))
+
+        # Energy Star 6.0
+        output.add("Energy Star 6.0:")
+        estar60 = EnergyStar60(sysinfo, graph)
+        P_TEC = estar60.equation_four()
+        P_TEC_MAX = estar60.equation_five()
+        if P_TEC <= P_TEC_MAX:
+            result = 'PASS'
+            operator = '<='
+        else:
+            result = 'FAIL'
+            operator = '>'
+        output.add("  %s (P_TEC) %s %s (P_TEC_MAX), %s" % (P_TEC, operator, P_TEC_MAX, result_filter(result, P_TEC, P_TEC_MAX)),
+                   compare('Energy Star 6.0', 'P_TEC', P_TEC, P_TEC_MAX))
+    elif sysinfo.product_type == 3:
+        # Energy Star 5.2
+        output.add("Energy Star 5.2:")
+        estar52 = EnergyStar52(sysinfo, graph)
+        for wol in (True, False):
+            (category, P_OFF_MAX, P_IDLE_MAX) = estar52.equation_five(wol)
+            P_OFF = sysinfo.off
+            P_IDLE = sysinfo.short_idle
+
+            if P_OFF <= P_OFF_MAX and P_IDLE <= P_IDLE_MAX:
+                result = 'PASS'
+            else:
+                result = 'FAIL'
+
+            if P_OFF <= P_OFF_MAX:
+                op1 = '<='
+            else:
+                op1 = '>'
+
+            if P_IDLE <= P_IDLE_MAX:
+                op2 = '<='
+            else:
+                op2 = '>'
+            if wol:
+                output.add("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
+            else:
+                output.add("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
+            name = 'Category %s, %s' % (category, 'WOL enabled' if wol else 'WOL disabled')
+            output.add("    Category %s: %s (P_OFF) %s %s (P_OFF_MAX), %s (P_IDLE) %s %s (P_IDLE_MAX), %s" % (category, P_OFF, op1, P_OFF_MAX, P_IDLE, op2, P_IDLE_MAX, result),
+                       compare('Energy Star 5.2', name + ', P_OFF', P_OFF, P_OFF_MAX))
+            output.add(None, compare('Energy Star 5.2', name + ', P_IDLE', P_IDLE, P_IDLE_MAX))
+
+        # Energy Star 6.0
+        output.add("Energy Star 6.0:")
+        estar60 = EnergyStar60(sysinfo, graph)
+        for wol in (True, False):
+            P_OFF = sysinfo.off
+            P_OFF_MAX = estar60.equation_six(wol)
+            P_IDLE = sysinfo.short_idle
+            P_IDLE_MAX = estar60.equation_seven()
+
+            if P_OFF <= P_OFF_MAX and P_IDLE <= P_IDLE_MAX:
+                result = 'PASS'
+            else:
+                result = 'FAIL'
+
+            if P_OFF <= P_OFF_MAX:
+                op1 = '<='
+            else:
+                op1 = '>'
+
+            if P_IDLE <= P_IDLE_MAX:
+                op2 = '<='
+            else:
+                op2 = '>'
+            if wol:
+                output.add("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
+            else:
+                output.add("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
+            scenario = 'WOL enabled' if wol else 'WOL disabled'
+            output.add("    %s (P_OFF) %s %s (P_OFF_MAX), %s (P_IDLE) %s %s (P_IDLE_MAX), %s" % (P_OFF, op1, P_OFF_MAX, P_IDLE, op2, P_IDLE_MAX, result),
+                       compare('Energy Star 6.0', scenario + ', P_OFF', P_OFF, P_OFF_MAX))
+            output.add(None, compare('Energy Star 6.0', scenario + ', P_IDLE', P_IDLE, P_IDLE_MAX))
+
+    elif sysinfo.product_type == 4:
+        # Energy Star 5.2
+        output.add("Energy Star 5.2:")
+        estar52 = EnergyStar52(sysinfo, graph)
+        for wol in (True, False):
+            if wol:
+                output.add("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
+            else:
+                output.add("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
+
+            P_OFF = sysinfo.off
+            P_OFF_MAX = estar52.equation_six(wol)
+
+            P_SLEEP = sysinfo.sleep
+            P_SLEEP_MAX = estar52.equation_seven(wol)
+
+            P_IDLE = sysinfo.short_idle
+            if sysinfo.media_codec:
+                P_IDLE_MAX = 15.0
+                category = 'B'
+            else:
+                P_IDLE_MAX = 12.0
+                category = 'A'
+
+            output.add("    Category %s:" % (category))
+            name = 'Category %s, %s' % (category, 'WOL enabled' if wol else 'WOL disabled')
+
+            if P_OFF <= P_OFF_MAX:
+                op1 = '<='
+            else:
+                op1 = '>'
+            output.add("      %s (P_OFF) %s %s (P_OFF_MAX)" % (P_OFF, op1, P_OFF_MAX),
+                       compare('Energy Star 5.2', name + ', P_OFF', P_OFF, P_OFF_MAX))
+
+            if P_SLEEP <= P_SLEEP_MAX:
+                op2 = '<='
+            else:
+                op2 = '>'
+            output.add("      %s (P_SLEEP) %s %s (P_SLEEP_MAX)" % (P_SLEEP, op2, P_SLEEP_MAX),
+                       compare('Energy Star 5.2', name + ', P_SLEEP', P_SLEEP, P_SLEEP_MAX))
+
+            if P_IDLE <= P_IDLE_MAX:
+                op3 = '<='
+            else:
+                op3 = '>'
+            output.add("      %s (P_IDLE) %s %s (P_IDLE_MAX)" % (P_IDLE, op3, P_IDLE_MAX),
+                       compare('Energy Star 5.2', name + ', P_IDLE', P_IDLE, P_IDLE_MAX))
+
+
+            if P_OFF <= P_OFF_MAX and P_SLEEP <= P_SLEEP_MAX and P_IDLE <= P_IDLE_MAX:
+                result = 'PASS'
+            else:
+                result = 'FAIL'
+            output.add("        %s" % (result))
+        # Energy Star 6.0
+        output.add("Energy Star 6.0:")
+        estar60 = EnergyStar60(sysinfo, graph)
+        E_TEC = estar60.equation_one()
+        for discrete in (True, False):
+            for wol in (True, False):
+                E_TEC_MAX = estar60.equation_eight(discrete, wol)
+                if discrete:
+                    msg1 = "it has Discrete Graphics enabled"
+                else:
+                    msg1 = "it doesn't have Discrete Graphics enabled"
+                if wol:
+                    msg2 = "Wake-On-LAN (WOL) is enabled"
+                else:
+                    msg2 = "Wake-On-LAN (WOL) is disabled"
+                output.add("  If %s and %s by default upon shipment," % (msg1, msg2))
+                if E_TEC <= E_TEC_MAX:
+                    operator = '<='
+                    result = 'PASS'
+                else:
+                    operator = '>'
+                    result = 'FAIL'
+                output.add("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)),
+                           compare('Energy Star 6.0', '%s, %s' % ('Discrete Graphics' if discrete else 'Integrated Graphics', 'WOL enabled' if wol else 'WOL disabled'), E_TEC, E_TEC_MAX))
+    else:
+        raise Exception('This is a bug when you see this.')
+    report.extend(output)
+    return output
+
+
+def erplot3_calculate(sysinfo, report=None, graph=None):
+    if sysinfo.product_type != 1:
+        return
+    if sysinfo.computer_type == 3:
+        if sysinfo.diagonal < 9 or sysinfo.long_idle < 6:
+            return
+    erplot3 = ErPLot3(sysinfo, graph)
+    erplot3.calculate(report)
+
+
+def erplot26_calculate(sysinfo, report=None):
+    if sysinfo.product_type != 1:
+        return
+    if sysinfo.computer_type != 3:
+        return
+    if sysinfo.diagonal > 9 and sysinfo.long_idle > 6:
+        return
+    erplot26 = ErPLot26(sysinfo)
+    erplot26.calculate(report)
+
+
+def evaluate_sysinfo(sysinfo):
+    """Return the list of Result records for a SysInfo object."""
+    report = Report()
+    graph = CalcGraph(sysinfo)
+    energystar_calculate(sysinfo, report, graph)
+    erplot3_calculate(sysinfo, report, graph)
+    erplot26_calculate(sysinfo, report)
+    return report.results()
+
+
+# The values of the profile keys choosing the calculators.
+PROFILE_CHOICES = {
+    "Product Type": (1, 2, 3, 4),
+    "Computer Type": (1, 2, 3)}
+
+
+def check_profile(profile):
+    """Raise a ValueError for a profile choosing no calculator."""
+    for key, choices in PROFILE_CHOICES.items():
+        if key not in profile:
+            continue
+        value = profile[key]
+        if isinstance(value, bool) or value not in choices:
+            raise ValueError("'%s' %r is invalid in the profile."
+                             % (key, value))
+
+
+def evaluate(profile, cache=None):
+    """Evaluate a profile dictionary and return a list of Result records.
+
+    The profile is not modified. It needs to be complete as saved by
+    energy-tools because nothing will be asked or probed; a ValueError is
+    raised for the missing and invalid answers. With a ResultCache, the results of a
+    profile seen before are returned without running any calculator."""
+    profile = dict(profile)
+    check_profile(profile)
+    if cache is not None:
+        results = cache.get(profile)
+        if results is not None:
+            return results
+        # SysInfo fills the profile with derived answers.
+        key = dict(profile)
+    sysinfo = SysInfo(profile, interactive=False)
+    results = evaluate_sysinfo(sysinfo.freeze())
+    if cache is not None:
+        cache.put(key, results)
+    return results
+
+
+class TestEvaluate(unittest.TestCase):
+    def setUp(self):
+        self.profile = {
+            'Product Type': 1,
+            'Computer Type': 3,
+            'CPU Clock': 2.0,
+            'CPU Cores': 2,
+            'Discrete Audio': False,
+            'Discrete Graphics': False,
+            'Discrete Graphics Cards': 0,
+            'Switchable Graphics': False,
+            'Disk Number': 1,
+            "SSD": 1,
+            'Display Diagonal': 14,
+            'Display Height': 768,
+            'Display Width': 1366,
+            'Screen Area': 83.4,
+            'Enhanced Display': False,
+            'Gigabit Ethernet': 1,
+            '1~10 Gigabit Ethernet': 0,
+            '10 Gigabit Ethernet': 0,
+            'Wake-on-LAN': False,
+            'Memory Size': 8,
+            'TV Tuner': False,
+            'Off Mode': 1.0,
+            'Off Mode with WOL': 1.0,
+            'Sleep Mode': 1.7,
+            'Sleep Mode with WOL': 1.7,
+            'Long Idle Mode': 8.0,
+            'Short Idle Mode': 10.0}
+
+    def test_notebook(self):
+        results = evaluate(self.profile)
+        estar5 = [r for r in results if r.spec == 'Energy Star 5.2']
+        self.assertEqual(len(estar5), 1)
+        self.assertEqual(estar5[0].scenario, 'Category A')
+        self.assertAlmostEqual(estar5[0].e_tec, 33.0252)
+        self.assertAlmostEqual(estar5[0].e_tec_max, 41.6)
+        self.assertEqual(estar5[0].verdict, 'PASS')
+        self.assertGreater(estar5[0].margin, 0)
+
+        estar6 = [r for r in results if r.spec == 'Energy Star 6.0']
+        self.assertEqual([r.scenario for r in estar6],
+                         ['PSU none', 'PSU lower', 'PSU higher'])
+        self.assertEqual([r.verdict for r in estar6], ['FAIL'] * 3)
+        self.assertLess(estar6[0].margin, 0)
+
+        estar8 = [r for r in results if r.spec == 'Energy Star 8.0']
+        self.assertEqual([r.scenario for r in estar8],
+                         ['Notebook', 'Mobile Workstation'])
+        self.assertAlmostEqual(estar8[1].e_tec_max - estar8[0].e_tec_max, 4.0)
+
+    def test_profile_untouched(self):
+        before = dict(self.profile)
+        evaluate(self.profile)
+        self.assertEqual(self.profile, before)
+
+    def test_cache(self):
+        class Cache:
+            def __init__(self):
+                self.data = {}
+
+            def get(self, profile):
+                return self.data.get(json.dumps(profile, sort_keys=True))
+
+            def put(self, profile, results):
+                self.data[json.dumps(profile, sort_keys=True)] = results
+
+        cache = Cache()
+        evaluate(self.profile, cache)
+        self.assertEqual(len(cache.data), 1)
+        for key in cache.data:
+            cache.data[key] = ['cached']
+        self.assertEqual(evaluate(self.profile, cache), ['cached'])
+
+    def test_freeze(self):
+        sysinfo = SysInfo(dict(self.profile), interactive=False)
+        frozen = sysinfo.freeze()
+        self.assertEqual(evaluate_sysinfo(frozen), evaluate_sysinfo(sysinfo))
+        self.assertRaises(AttributeError, setattr, frozen, 'off', 0)
+        with self.assertRaises(TypeError):
+            frozen.profile['SSD'] = 0
+
+    def test_invalid_profile(self):
+        for key, value in (('Product Type', 5), ('Computer Type', 4),
+                           ('Computer Type', True), ('Product Type', '1')):
+            profile = dict(self.profile, **{key: value})
+            with self.assertRaises(ValueError) as cm:
+                evaluate(profile)
+            self.assertEqual(str(cm.exception),
+                             "'%s' %r is invalid in the profile."
+                             % (key, value))
+
+    def test_incomplete_profile(self):
+        # Nothing of the machine running the tests is probed instead.
+        for key in ('Off Mode', 'CPU Cores', 'CPU Clock', 'Memory Size',
+                    'Disk Number', 'Display Diagonal', 'Screen Area',
+                    'Display Width', 'Gigabit Ethernet',
+                    '1~10 Gigabit Ethernet', '10 Gigabit Ethernet',
+                    'Wake-on-LAN'):
+            profile = dict(self.profile)
+            del profile[key]
+            with self.assertRaises(ValueError) as cm:
+                evaluate(profile)
+            self.assertEqual(str(cm.exception),
+                             "'%s' is missing in the profile." % key)
+        self.profile['Disk Number'] = 3
+        self.assertRaises(ValueError, evaluate, self.profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
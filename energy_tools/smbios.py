@@ -0,0 +1,168 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Parser of the SMBIOS structure table exported by the kernel.
+
+Only the structures used by energy-tools are decoded: BIOS (type 0),
+System (type 1), Chassis (type 3), Physical Memory Array (type 16) and
+Memory Device (type 17).
+"""
+
+import struct
+import unittest
+from collections import namedtuple
+
+__all__ = [
+        "SMBIOS",
+        "Structure"]
+
+DMI_TABLE = '/sys/firmware/dmi/tables/DMI'
+
+Structure = namedtuple('Structure', ['type', 'handle', 'data', 'strings'])
+
+
+class SMBIOS:
+    """Structures of one SMBIOS table"""
+    def __init__(self, table):
+        self.structures = []
+        offset = 0
+        while offset + 4 <= len(table):
+            (kind, length, handle) = struct.unpack_from('<BBH', table, offset)
+            if length < 4 or offset + length > len(table):
+                break
+            data = table[offset:offset + length]
+            end = table.find(b'\0\0', offset + length)
+            if end < 0:
+                break
+            strings = [string.decode('latin-1').strip() for string in
+                       table[offset + length:end].split(b'\0') if string]
+            self.structures.append(Structure(kind, handle, data, strings))
+            offset = end + 2
+            if kind == 127:
+                break
+
+    @classmethod
+    def read(cls, path=DMI_TABLE):
+        with open(path, 'rb') as table:
+            return cls(table.read())
+
+    def find(self, kind):
+        return [structure for structure in self.structures
+                if structure.type == kind]
+
+    def _byte(self, structure, offset):
+        if offset < len(structure.data):
+            return structure.data[offset]
+        return None
+
+    def _string(self, kind, offset):
+        for structure in self.find(kind):
+            index = self._byte(structure, offset)
+            if index and index <= len(structure.strings):
+                return structure.strings[index - 1]
+        return None
+
+    @property
+    def bios_version(self):
+        return self._string(0, 0x05)
+
+    @property
+    def product_name(self):
+        return self._string(1, 0x05)
+
+    @property
+    def chassis_type(self):
+        for structure in self.find(3):
+            value = self._byte(structure, 0x05)
+            if value is not None:
+                return value & 0x7f
+        return None
+
+    @property
+    def memory_slots(self):
+        """Number of memory devices of all physical memory arrays"""
+        slots = 0
+        for structure in self.find(16):
+            if len(structure.data) >= 0x0f:
+                slots = slots + struct.unpack_from('<H', structure.data,
+                                                   0x0d)[0]
+        return slots
+
+    @property
+    def memory_devices(self):
+        """Size in MB of every memory device, 0 for an empty slot"""
+        sizes = []
+        for structure in self.find(17):
+            if len(structure.data) < 0x0e:
+                continue
+            size = struct.unpack_from('<H', structure.data, 0x0c)[0]
+            if size == 0xffff:
+                size = 0
+            elif size == 0x7fff and len(structure.data) >= 0x20:
+                size = struct.unpack_from('<I', structure.data, 0x1c)[0] \
+                    & 0x7fffffff
+            elif size & 0x8000:
+                size = (size & 0x7fff) // 1024
+            sizes.append(size)
+        return sizes
+
+
+def _structure(kind, handle, data, strings=()):
+    """Pack one structure of a table for the tests."""
+    formatted = struct.pack('<BBH', kind, 4 + len(data), handle) + data
+    tail = b''.join(string.encode() + b'\0' for string in strings)
+    return formatted + (tail or b'\0') + b'\0'
+
+
+class TestSMBIOS(unittest.TestCase):
+    def setUp(self):
+        bios = _structure(0, 0, struct.pack('<BBHBBHB', 1, 2, 0xe800, 3, 0,
+                                            0, 0),
+                          ('Vendor', '1.2.3', '01/01/2020'))
+        system = _structure(1, 1, bytes((1, 2, 0, 0)),
+                            ('Vendor', 'Product Name'))
+        chassis = _structure(3, 2, bytes((1, 0x8a)), ('Vendor',))
+        array = _structure(16, 3, struct.pack('<BBBIHH', 3, 3, 3, 0x2000000,
+                                              0xfffe, 4))
+        devices = b''
+        for handle, size in ((4, 8192), (5, 0), (6, 0x7fff), (7, 0x8000 | 512)):
+            data = struct.pack('<HHHHHBBBBBHH', 3, 0xfffe, 64, 64, size,
+                               0x1a, 0, 0, 0, 0x1a, 0x80, 0) + bytes(5)
+            data = data + struct.pack('<I', 32768 if size == 0x7fff else 0)
+            devices = devices + _structure(17, handle, data)
+        end = _structure(127, 8, b'')
+        self.table = bios + system + chassis + array + devices + end
+
+    def test_parse(self):
+        smbios = SMBIOS(self.table + b'garbage after the end')
+        self.assertEqual(len(smbios.structures), 9)
+        self.assertEqual(smbios.bios_version, '1.2.3')
+        self.assertEqual(smbios.product_name, 'Product Name')
+        self.assertEqual(smbios.chassis_type, 10)
+        self.assertEqual(smbios.memory_slots, 4)
+        self.assertEqual(smbios.memory_devices, [8192, 0, 32768, 0])
+
+    def test_truncated(self):
+        smbios = SMBIOS(self.table[:45])
+        self.assertEqual(smbios.bios_version, '1.2.3')
+        self.assertIsNone(smbios.product_name)
+        self.assertEqual(smbios.memory_devices, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,14 +16,478 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from logging import debug, info, warning, error
 from pathlib import Path
+from types import MappingProxyType
 
+import errno
 import json
 import math
 import os
 import re
 import subprocess
+import tempfile
+import unittest
+
+from .cache import ProbeCache, probe_key
+from .cpuinfo import CpuInfo
+from .host import Host, RecordingHost, ReplayHost, host, set_host
+from .probe import ProbeError, Prober, probe
+from .smbios import DMI_TABLE, SMBIOS
+
+
+EDID_BLOCK_SIZE = 128
+# An EDID has at most 255 extension blocks.
+EDID_MAX_SIZE = 256 * EDID_BLOCK_SIZE
+INTERNAL_CONNECTORS = ('eDP', 'LVDS', 'DSI')
+
+
+def drm_edid_paths(drm='/sys/class/drm'):
+    """Return the EDID files of the DRM connectors.
+
+    The connected internal panels come first, then the other connected
+    connectors and the disconnected ones last."""
+    ranked = []
+    for edid in host().glob(drm, '*/edid'):
+        edid = Path(edid)
+        connector = edid.parent
+        try:
+            status = host().read_text(connector / 'status').strip()
+        except OSError:
+            status = ''
+        # card0-eDP-1, card1-HDMI-A-1
+        kind = (connector.name.split('-') + [''])[1]
+        ranked.append(((status != 'connected',
+                        kind not in INTERNAL_CONNECTORS,
+                        connector.name), edid))
+    return [edid for rank, edid in sorted(ranked)]
+
+
+@probe('edid', timeout=30)
+def find_edid():
+    """Return the path and the content of the first EDID or None."""
+    # The recursive glob walks the whole device tree, so it is only
+    # the last resort when no DRM connector has an EDID.
+    for candidates in (drm_edid_paths,
+                       lambda: host().glob('/sys/devices', '**/edid')):
+        for edid in candidates():
+            content = host().read(edid, EDID_MAX_SIZE)
+            if len(content) >= EDID_BLOCK_SIZE:
+                return (edid, content)
+    return None
+
+
+ETHTOOL_TIMEOUT = 5
+Ethernet = namedtuple('Ethernet', ['one_glan', 'one_to_ten_glan', 'ten_glan',
+                                   'wol'])
+
+
+def ethernet_devices():
+    return [dev for dev in sorted(host().listdir("/sys/class/net/"))
+            if dev.startswith('eth') or dev.startswith('en')]
+
+
+def show_eee(dev):
+    """Return the output of `ethtool --show-eee` or None if it fails."""
+    try:
+        return host().run(['ethtool', '--show-eee', dev],
+                          timeout=ETHTOOL_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        warning("`ethtool --show-eee " + dev
+                + "` timed out. Please check it.")
+    except (OSError, subprocess.CalledProcessError):
+        warning("`ethtool --show-eee " + dev + "` failed. Please check it.")
+    return None
+
+
+def eee_speed(output):
+    """Classify the EEE link modes of `ethtool --show-eee`.
+
+    Returns 'ten', 'one_to_ten', 'one' or None if EEE is not enabled."""
+    if not output:
+        return None
+    eee_enabled = False
+    for line in output.split('\t'):
+        if eee_enabled:
+            if "10000baseT/Full" in line:
+                return 'ten'
+            elif "5000baseT/Full" in line:
+                return 'one_to_ten'
+            elif "2500baseT/Full" in line:
+                return 'one_to_ten'
+            elif "1000baseT/Full" in line:
+                return 'one'
+        elif "EEE status: enabled" in line:
+            eee_enabled = True
+    return None
+
+
+# The legacy ETHTOOL_GEEE link modes in the order listed by ethtool:
+# 1000baseT/Full and 10000baseT/Full.
+EEE_LINK_MODES = ((1 << 5, 'one'), (1 << 12, 'ten'))
+
+
+def eee_link_speed(dev):
+    """Classify the EEE link modes of dev like eee_speed().
+
+    ETHTOOL_GEEE is asked in process. The 2500baseT and 5000baseT modes are
+    beyond its legacy masks, so `ethtool --show-eee` is still run when no
+    known link mode is supported or the ioctl fails."""
+    try:
+        (supported, advertised, lp_advertised, active, enabled) = \
+            host().ethtool_eee(dev)
+    except OSError as err:
+        if err.errno == errno.EOPNOTSUPP:
+            debug("%s does not support EEE." % dev)
+            return None
+        debug("ETHTOOL_GEEE of %s failed: %s" % (dev, err))
+        return eee_speed(show_eee(dev))
+    if not enabled:
+        return None
+    for (mask, speed) in EEE_LINK_MODES:
+        if supported & mask:
+            return speed
+    return eee_speed(show_eee(dev))
+
+
+def wakeup_enabled(dev):
+    wakeup = os.path.join("/sys", "class", "net", dev,
+                          "device", "power", "wakeup")
+    debug("Checking " + wakeup)
+    if host().exists(wakeup):
+        return 'enabled' in host().read_text(wakeup)
+    return False
+
+
+@probe('ethernet', timeout=2 * ETHTOOL_TIMEOUT)
+def probe_ethernet():
+    """Probe EEE and Wake-on-LAN of all Ethernet interfaces."""
+    devices = ethernet_devices()
+    counts = {'one': 0, 'one_to_ten': 0, 'ten': 0}
+    with ThreadPoolExecutor(max_workers=max(len(devices), 1),
+                            thread_name_prefix='probe-ethernet') as executor:
+        for speed in executor.map(eee_link_speed, devices):
+            if speed:
+                counts[speed] = counts[speed] + 1
+    wol = any(wakeup_enabled(dev) for dev in devices)
+    return Ethernet(counts['one'], counts['one_to_ten'], counts['ten'], wol)
+
+
+@probe('smbios')
+def read_smbios():
+    """Return the SMBIOS table, empty if it is not readable."""
+    try:
+        return SMBIOS(host().read(DMI_TABLE))
+    except OSError as err:
+        debug("Can not read %s: %s" % (DMI_TABLE, err))
+        return SMBIOS(b'')
+
+
+@probe('chassis')
+def read_chassis_type():
+    if host().exists('/sys/class/dmi/id/chassis_type'):
+        return int(host().read_text('/sys/class/dmi/id/chassis_type'))
+    return None
+
+
+@probe('cpuinfo')
+def read_cpuinfo():
+    return CpuInfo(host().read_text('/proc/cpuinfo'))
+
+
+CPU = '/sys/devices/system/cpu'
+CpuFreq = namedtuple('CpuFreq', ['base', 'nominal', 'maximum'])
+
+
+def cpu_list(text):
+    """Parse a CPU list of sysfs such as '0 1' or '0-3,8'."""
+    cpus = []
+    for item in text.replace(',', ' ').split():
+        (first, sep, last) = item.partition('-')
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _read_int(path):
+    try:
+        return int(_read_sysfs(path))
+    except (TypeError, ValueError):
+        return None
+
+
+@probe('cpufreq')
+def cpufreq_clocks(cpu=CPU):
+    """Return the CpuFreq clocks in GHz of all cpufreq policies.
+
+    base is base_frequency, nominal the ACPI CPPC nominal_freq and maximum
+    cpuinfo_max_freq. Each clock is the mean of the policies weighted by
+    their physical cores, so cores x clock adds up the core types of a
+    hybrid processor. A clock is None if no policy has it."""
+    try:
+        policies = sorted((name for name in host().listdir(
+            os.path.join(cpu, 'cpufreq')) if name.startswith('policy')),
+            key=lambda name: int(name[len('policy'):] or 0))
+    except (OSError, ValueError):
+        policies = []
+    sums = {'base': [0, 0], 'nominal': [0, 0], 'maximum': [0, 0]}
+    seen = set()
+    for policy in policies:
+        path = os.path.join(cpu, 'cpufreq', policy)
+        cpus = cpu_list(_read_sysfs(os.path.join(path, 'related_cpus'))
+                        or '')
+        # The SMT siblings of a physical core share one sibling list and
+        # may be in different policies.
+        cores = set(
+            _read_sysfs(os.path.join(cpu, 'cpu%d' % n, 'topology',
+                                     'thread_siblings_list')) or str(n)
+            for n in cpus) - seen
+        seen.update(cores)
+        if cpus and not cores:
+            continue
+        cores = len(cores) or 1
+        clocks = {'base': _read_int(os.path.join(path, 'base_frequency')),
+                  'maximum': _read_int(os.path.join(path,
+                                                    'cpuinfo_max_freq')),
+                  'nominal': None}
+        if cpus:
+            nominal = _read_int(os.path.join(cpu, 'cpu%d' % cpus[0],
+                                             'acpi_cppc', 'nominal_freq'))
+            # MHz instead of kHz
+            if nominal:
+                clocks['nominal'] = nominal * 1000
+        for kind, clock in clocks.items():
+            if clock:
+                sums[kind][0] = sums[kind][0] + cores * clock
+                sums[kind][1] = sums[kind][1] + cores
+    return CpuFreq(*(sums[kind][0] / sums[kind][1] / 1000000
+                     if sums[kind][1] else None
+                     for kind in CpuFreq._fields))
+
+
+MEMORY = '/sys/devices/system/memory'
+
+
+def meminfo_total(meminfo='/proc/meminfo'):
+    """Return MemTotal of /proc/meminfo in bytes or None."""
+    for line in host().read_text(meminfo).split('\n'):
+        if line.startswith('MemTotal:'):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+def online_memory_blocks(memory=MEMORY):
+    """Count the online memory blocks with one pass over the directory."""
+    total_online = 0
+    for name in host().listdir(memory):
+        if not name.startswith('memory'):
+            continue
+        try:
+            if host().read(os.path.join(memory, name, 'online'), 1) == b'1':
+                total_online = total_online + 1
+        except FileNotFoundError:
+            pass
+    return total_online
+
+
+# MemTotal excludes the memory reserved by the firmware and the kernel.
+MEMINFO_ROUNDING = 1024 * 1024 * 1024
+
+
+@probe('memory')
+def memory_size(memory=MEMORY, meminfo='/proc/meminfo'):
+    """Return the memory size in GB.
+
+    MemTotal of /proc/meminfo is rounded up to 1 GB. The online memory
+    blocks are only counted if /proc/meminfo is not readable, because
+    large hosts have tens of thousands of them."""
+    try:
+        total = meminfo_total(meminfo)
+    except (OSError, ValueError):
+        total = None
+
+    if total:
+        total = -(-total // MEMINFO_ROUNDING) * MEMINFO_ROUNDING
+    else:
+        try:
+            block_size = int(host().read_text(
+                os.path.join(memory, 'block_size_bytes')).strip(), 16)
+            total = block_size * online_memory_blocks(memory)
+        except (OSError, ValueError):
+            total = 0
+        if not total:
+            raise ValueError("Can not read the memory size from %s or %s."
+                             % (meminfo, memory))
+
+    return total / 1024 / 1024 / 1024
+
+
+@probe('disks')
+def block_devices(block='/sys/block'):
+    return sorted(disk for disk in host().listdir(block)
+                  if 'sd' in disk or 'nvme' in disk or 'emmc' in disk)
+
+
+BlockDevice = namedtuple('BlockDevice', ['name', 'rotational', 'model'])
+
+# The indexes of the storage types asked by SysInfo.
+(SYSTEM_DISK, HDD_3_5, HDD_2_5, HYBRID, SSD) = range(5)
+
+HYBRID_MODELS = re.compile(r'SSHD|HYBRID', re.IGNORECASE)
+# Drive families of the usual vendors with a known form factor.
+HDD_2_5_MODELS = re.compile(
+    r'ST\d+LM|WD\d+(BPVX|BPVT|LPVX|SPZX|BEVT|BEKT|BPKX|LPCX)|HT[SE]\d|'
+    r'TOSHIBA MQ')
+HDD_3_5_MODELS = re.compile(
+    r'ST\d+(DM|NM|VN|VX|NE)|WD\d+(EZEX|EZRZ|EFRX|EFAX|EZAZ|FZEX|PURZ|FYYZ)|'
+    r'H[DU]S\d|HU[AH]\d|HDN\d|TOSHIBA (DT|MD|MG|HDW[DEG])')
+
+
+def _read_sysfs(path):
+    try:
+        return host().read_text(path).strip()
+    except OSError:
+        return None
+
+
+@probe('storage')
+def block_device_facts(block='/sys/block'):
+    """Return the BlockDevice of every disk."""
+    facts = {}
+    for disk in block_devices(block):
+        rotational = _read_sysfs(os.path.join(block, disk, 'queue',
+                                              'rotational'))
+        facts[disk] = BlockDevice(
+            disk, None if rotational is None else rotational == '1',
+            _read_sysfs(os.path.join(block, disk, 'device', 'model')) or '')
+    return facts
+
+
+def classify_storage(device, computer_type=None):
+    """Return the storage type of a BlockDevice or None if unsure.
+
+    NVMe and eMMC disks and the non-rotational ones are SSD. The hybrid
+    drives and the form factor of the hard drives are told by the model,
+    otherwise a notebook only fits a 2.5 inch hard drive."""
+    if device.name.startswith('nvme') or device.name.startswith('mmcblk') \
+            or 'emmc' in device.name:
+        return SSD
+    if device.rotational is None:
+        return None
+    if not device.rotational:
+        return SSD
+    if HYBRID_MODELS.search(device.model):
+        return HYBRID
+    if HDD_2_5_MODELS.search(device.model):
+        return HDD_2_5
+    if HDD_3_5_MODELS.search(device.model):
+        return HDD_3_5
+    if computer_type == 3:
+        return HDD_2_5
+    return None
+
+
+Mount = namedtuple('Mount', ['mount_point', 'source'])
+
+
+def parse_mountinfo(text):
+    """Return the mount points and the sources of /proc/self/mountinfo."""
+    mounts = []
+    for line in text.split('\n'):
+        fields = line.split(' ')
+        if '-' not in fields[6:]:
+            continue
+        separator = fields.index('-', 6)
+        if separator + 2 >= len(fields):
+            continue
+        mount_point = fields[4].replace('\\040', ' ')
+        mounts.append(Mount(mount_point, fields[separator + 2]))
+    return mounts
+
+
+@probe('mountinfo')
+def read_mountinfo():
+    return parse_mountinfo(host().read_text('/proc/self/mountinfo'))
+
+
+def parent_disk(device, disks):
+    """Return the disk of a device or partition name, sda1 -> sda."""
+    for disk in disks:
+        if device == disk:
+            return disk
+        suffix = device[len(disk):]
+        if device.startswith(disk) and \
+                suffix.lstrip('p').isdigit():
+            return disk
+    return None
+
+
+def system_disks(disks, mounts):
+    """Return the disks holding /boot or a mount point below it."""
+    found = set()
+    for mount in mounts:
+        if mount.mount_point != '/boot' and \
+                not mount.mount_point.startswith('/boot/'):
+            continue
+        disk = parent_disk(os.path.basename(mount.source), disks)
+        if disk:
+            found.add(disk)
+    return found
+
+
+FROZEN_FIELDS = (
+    'product_type', 'computer_type', 'cpu_core', 'cpu_clock', 'mem_size',
+    'disk_num', 'one_glan', 'one_to_ten_glan', 'ten_glan',
+    'discrete', 'discrete_gpu_num', 'switchable', 'more_discrete', 'audio',
+    'tvtuner', 'media_codec', 'integrated_display', 'fb_bw', 'diagonal', 'ep',
+    'width', 'height', 'screen_area', 'off', 'off_wol', 'sleep', 'sleep_wol',
+    'long_idle', 'short_idle', 'max_power', 'profile')
+
+
+class FrozenSysInfo(namedtuple('FrozenSysInfo', FROZEN_FIELDS)):
+    """Immutable snapshot of a SysInfo returned by SysInfo.freeze()
+
+    Every answer is precomputed, so the getters only return fields and
+    never ask, probe or touch the profile. The fields a product type does
+    not use are None."""
+    __slots__ = ()
+
+    def get_cpu_core(self):
+        return self.cpu_core
+
+    def get_cpu_clock(self):
+        return self.cpu_clock
+
+    def get_mem_size(self):
+        return self.mem_size
+
+    def get_disk_num(self):
+        return self.disk_num
+
+    def get_basic_info(self):
+        return (self.cpu_core, self.cpu_clock, self.mem_size, self.disk_num)
+
+    def get_power_consumptions(self):
+        return (self.off, self.sleep, self.long_idle, self.short_idle)
+
+    def get_1glan_num(self):
+        return self.one_glan
+
+    def get_1to10glan_num(self):
+        return self.one_to_ten_glan
+
+    def get_10glan_num(self):
+        return self.ten_glan
+
+    def get_display(self):
+        return (self.diagonal, self.ep)
+
+    def get_resolution(self):
+        return (self.width, self.height)
+
+    def get_screen_area(self):
+        return self.screen_area
 
 
 class SysInfo:
@@ -57,31 +521,46 @@ class SysInfo:
         return rbytes
 
     def edid_decode(self):
-        monitor = None
-        for edid in Path('/sys/devices').glob('**/edid'):
-            try:
-                with open(edid, 'rb') as f:
-                    content = f.read()
-                    if len(content) != 0:
-                        monitor = edid
-                        self.width, self.height, self.width_mm, self.height_mm = self.get_width_height_width_mm_height_mm(self.read_edid(f, 0x36, 18))
-                        break
-            except PermissionError as err:
+        try:
+            found = self._probe('edid')
+        except ProbeError as err:
+            if isinstance(err.cause, PermissionError):
                 if 'SNAP_NAME' in os.environ and \
                         os.environ['SNAP_NAME'] == 'energy-tools':
                     error('Please execute `snap connect energy-tools:'
                           + 'hardware-observe` to get the permissions.')
-                raise err
+                raise err.cause
+            raise err
 
-        if monitor is None:
+        if found is None:
             return None
 
+        (monitor, content) = found
+        self.width, self.height, self.width_mm, self.height_mm = self.get_width_height_width_mm_height_mm(content[0x36:0x36 + 18])
+
         debug("EDID location is %s" % (monitor))
         debug('%s %s %s %s' % (self.width, self.height, self.width_mm, self.height_mm))
 
+    def _not_interactive(self, name):
+        if name:
+            return ValueError("'%s' is missing in the profile." % name)
+        return ValueError("The profile is incomplete.")
+
+    def _check_interactive(self, *names):
+        """Raise for the first name missing in the profile if the hardware
+        must not be probed."""
+        if self.interactive:
+            return
+        for name in names:
+            if name not in self.profile:
+                raise self._not_interactive(name)
+        raise self._not_interactive(None)
+
     def question_str(self, prompt, length, validator, name):
         if name in self.profile:
             return self.profile[name]
+        if not self.interactive:
+            raise self._not_interactive(name)
         while True:
             s = input(prompt + "\n>> ")
             if len(s) == length and set(s).issubset(validator):
@@ -93,6 +572,8 @@ class SysInfo:
     def question_bool(self, prompt, name):
         if name in self.profile:
             return self.profile[name]
+        if not self.interactive:
+            raise self._not_interactive(name)
         while True:
             s = input(prompt + " [y/n]\n>> ")
             if len(s) == 1 and set(s).issubset("YyNn01"):
@@ -109,6 +590,8 @@ class SysInfo:
     def question_int(self, prompt, maximum, name=None):
         if name and name in self.profile:
             return self.profile[name]
+        if not self.interactive:
+            raise self._not_interactive(name)
         while True:
             s = input(prompt + "\n>> ")
             if not set(s).issubset("0123456789"):
@@ -126,6 +609,8 @@ class SysInfo:
     def question_num(self, prompt, name):
         if name in self.profile:
             return self.profile[name]
+        if not self.interactive:
+            raise self._not_interactive(name)
         while True:
             s = input(prompt + "\n>> ")
             try:
@@ -141,6 +626,7 @@ class SysInfo:
         if key in self.profile:
             return self.profile[key]
         else:
+            self._check_interactive(key)
             if self.width_mm is None or self.height_mm is None:
                 self.edid_decode()
             diagonal_mm = math.sqrt(self.width_mm ** 2 + self.height_mm ** 2)
@@ -152,12 +638,16 @@ class SysInfo:
         if key in self.profile:
             return self.profile[key]
         else:
+            self._check_interactive(key)
             if self.width_mm is None or self.height_mm is None:
                 self.edid_decode()
             self.profile[key] = self.width_mm * self.height_mm / 25.4 / 25.4
             return self.profile[key]
 
-    def __init__(self, profile=None, chassis=0, manual=False):
+    def __init__(self, profile=None, chassis=0, manual=False,
+                 interactive=True, reprobe=False):
+        self.interactive = interactive
+        self.prober = None
         self.ep = False
         self.diagonal = 0.0
         self.width = None
@@ -165,13 +655,20 @@ class SysInfo:
         self.width_mm = None
         self.height_mm = None
 
+        if not profile:
+            self.prober = self._start_probes(reprobe)
+
+        source = '/sys/class/dmi/id/chassis_type'
         if not manual and not profile and \
-                os.path.exists('/sys/class/dmi/id/chassis_type'):
+                self._get_smbios().chassis_type is not None:
+            chassis = self._get_smbios().chassis_type
+            source = DMI_TABLE
+        elif not manual and not profile:
             try:
-                with open('/sys/class/dmi/id/chassis_type') as chassis_type:
-                    chassis = int(chassis_type.read().strip())
-            except PermissionError as err:
-                if 'SNAP_NAME' in os.environ and \
+                chassis = self._probe('chassis') or chassis
+            except ProbeError as err:
+                if isinstance(err.cause, PermissionError) and \
+                        'SNAP_NAME' in os.environ and \
                         os.environ['SNAP_NAME'] == 'energy-tools':
                     error('Please execute `snap connect energy-tools:'
                           + 'hardware-observe` to get the permissions.')
@@ -202,7 +699,7 @@ class SysInfo:
             product_type = "Notebook"
 
         if product_type:
-            info("According to /sys/class/dmi/id/chassis_type (" + str(chassis)
+            info("According to " + source + " (" + str(chassis)
                  + "), it should be a " + product_type + " Computer.")
             info("Use '-m' option to skip this detection if wrong.")
 
@@ -291,22 +788,42 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""",
                         self.profile[disk_type] = 0
 
                 if disk_num > 1:
-                    for disk in subprocess.check_output(
-                            'ls /sys/block | grep -e sd -e nvme -e emmc',
-                            shell=True, encoding='utf8').strip().split('\n'):
-                        if not manual:
-                            try:
-                                subprocess.check_output("grep " + disk + " /proc/mounts | grep boot", shell=True, encoding='utf8', stderr=subprocess.STDOUT)
-                                self.profile["Unknown / System Disk"] = \
-                                    self.profile["Unknown / System Disk"] + 1
-                                info("/sys/block/" + disk + " is detected as the system disk.")
+                    if not self.interactive:
+                        raise ValueError("The storage types of %d disks are"
+                                         " missing in the profile."
+                                         % disk_num)
+                    disks = self._probe('disks')
+                    boot = set()
+                    if not manual:
+                        try:
+                            boot = system_disks(disks,
+                                                self._probe('mountinfo'))
+                        except ProbeError as err:
+                            if 'SNAP_NAME' in os.environ and os.environ['SNAP_NAME'] == 'energy-tools' and isinstance(err.cause, PermissionError):
+                                print(err)
+                                warning('Please execute `snap connect energy-tools:mount-observe` to get the permissions.')
+                    storage = {}
+                    if not manual:
+                        try:
+                            storage = self._probe('storage')
+                        except ProbeError as err:
+                            warning(str(err))
+                    for disk in disks:
+                        if disk in boot:
+                            self.profile["Unknown / System Disk"] = \
+                                self.profile["Unknown / System Disk"] + 1
+                            info("/sys/block/" + disk + " is detected as the system disk.")
+                            info("Use '-m' option to skip this detection if wrong.")
+                            continue
+                        if disk in storage:
+                            disk_type = classify_storage(storage[disk],
+                                                         self.computer_type)
+                            if disk_type is not None:
+                                self.profile[storage_tuple[disk_type]] = \
+                                    self.profile[storage_tuple[disk_type]] + 1
+                                info("/sys/block/" + disk + " is detected as " + storage_tuple[disk_type] + ".")
                                 info("Use '-m' option to skip this detection if wrong.")
                                 continue
-                            except subprocess.CalledProcessError as e:
-                                if 'SNAP_NAME' in os.environ and os.environ['SNAP_NAME'] == 'energy-tools' and 'grep: /proc/mounts: Permission denied' in e.output:
-                                    print(e.output.strip())
-                                    warning('Please execute `snap connect energy-tools:mount-observe` to get the permissions.')
-                                pass
                         disk_type = self.question_int("""Which storage type for /sys/block/%s?
 [0] Unknown / System Disk
 [1] 3.5" HDD
@@ -412,20 +929,19 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
                     self.ep = False
 
         # Ethernet
+        if "Gigabit Ethernet" not in self.profile or \
+                "1~10 Gigabit Ethernet" not in self.profile or \
+                "10 Gigabit Ethernet" not in self.profile:
+            self._check_ethernet_num()
+
         if "Gigabit Ethernet" in self.profile:
             self.one_glan = self.profile["Gigabit Ethernet"]
-        else:
-            self._check_ethernet_num()
 
         if "1~10 Gigabit Ethernet" in self.profile:
             self.one_to_ten_glan = self.profile["1~10 Gigabit Ethernet"]
-        else:
-            self._check_ethernet_num()
 
         if "10 Gigabit Ethernet" in self.profile:
             self.ten_glan = self.profile["10 Gigabit Ethernet"]
-        else:
-            self._check_ethernet_num()
 
         if "Disk Number" in self.profile:
             self.disk_num = self.profile["Disk Number"]
@@ -436,103 +952,113 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
         if "Memory Size" in self.profile:
             self.mem_size = self.profile["Memory Size"]
 
+    def _probe_key(self):
+        """Return the key of the probe cache or None."""
+        try:
+            identity = [host().read_text(path).strip() for path in (
+                '/sys/class/dmi/id/product_name',
+                '/sys/class/dmi/id/bios_version',
+                '/proc/sys/kernel/random/boot_id')]
+        except OSError as err:
+            debug("Can not identify the machine: %s" % err)
+            return None
+        return probe_key(*identity)
+
+    def _start_probes(self, reprobe=False):
+        # The cache is only for the live system, not for the recordings
+        # and the statistics of --record-probe, --replay-probe and
+        # --probe-stats.
+        if type(host()) is not Host:
+            return Prober().start()
+        key = self._probe_key()
+        if key is None:
+            return Prober().start()
+        cache = ProbeCache()
+        if not reprobe:
+            results = cache.load(key)
+            if results is not None:
+                info("Use the hardware probed in this boot. Use '--reprobe'"
+                     " option to probe it again.")
+                return Prober.cached(results)
+
+        def done(prober):
+            if not any(isinstance(value, ProbeError) and
+                       value.reason == 'timeout'
+                       for value in prober.results.values()):
+                cache.save(key, prober.results)
+
+        # All probes run concurrently in the background while the
+        # questions are answered.
+        return Prober().start(done)
+
+    def _probe(self, name):
+        """Return the result of a probe, run it first if needed."""
+        self._check_interactive()
+        if self.prober is None:
+            self.prober = Prober([])
+        return self.prober.result(name)
+
+    def _probe_ethernet(self):
+        try:
+            ethernet = self._probe('ethernet')
+        except ProbeError as err:
+            warning(str(err))
+            ethernet = Ethernet(0, 0, 0, False)
+        debug("Ethernet: %s" % (ethernet,))
+        return ethernet
+
     def _check_wol(self):
         if "Wake-on-LAN" in self.profile:
             return self.profile["Wake-on-LAN"]
-        for dev in os.listdir("/sys/class/net/"):
-            if dev.startswith('eth') or dev.startswith('en'):
-                wakeup = os.path.join("/sys", "class", "net", dev,
-                                      "device", "power", "wakeup")
-                debug("Checking " + wakeup)
-                if os.path.exists(wakeup):
-                    with open(wakeup, 'r') as f:
-                        value = f.read()
-                        if 'enabled' in value:
-                            self.profile["Wake-on-LAN"] = True
-                            return True
-        self.profile["Wake-on-LAN"] = False
-        return False
+        self._check_interactive("Wake-on-LAN")
+        self.profile["Wake-on-LAN"] = self._probe_ethernet().wol
+        return self.profile["Wake-on-LAN"]
 
     def _check_ethernet_num(self):
-        self.one_glan = 0
-        self.one_to_ten_glan = 0
-        self.ten_glan = 0
-        for dev in os.listdir("/sys/class/net/"):
-            if dev.startswith('eth') or dev.startswith('en'):
-                eee_enabled = False
-                try:
-                    output = subprocess.check_output(
-                        "ethtool --show-eee " + dev,
-                        shell=True, encoding='utf8')
-                except subprocess.CalledProcessError:
-                    warning("`ethtool --show-eee " + dev
-                            + "` failed. Please check it.")
-                    continue
-                for line in output.split('\t'):
-                    if eee_enabled:
-                        if "10000baseT/Full" in line:
-                            self.ten_glan = self.ten_glan + 1
-                            break
-                        elif "5000baseT/Full" in line:
-                            self.one_to_ten_glan = self.one_to_ten_glan + 1
-                            break
-                        elif "2500baseT/Full" in line:
-                            self.one_to_ten_glan = self.one_to_ten_glan + 1
-                            break
-                        elif "1000baseT/Full" in line:
-                            self.one_glan = self.one_glan + 1
-                            break
-                    elif "EEE status: enabled" in line:
-                        eee_enabled = True
+        self._check_interactive("Gigabit Ethernet", "1~10 Gigabit Ethernet",
+                                "10 Gigabit Ethernet")
+        ethernet = self._probe_ethernet()
+        self.one_glan = ethernet.one_glan
+        self.one_to_ten_glan = ethernet.one_to_ten_glan
+        self.ten_glan = ethernet.ten_glan
+
+    def _get_cpuinfo(self):
+        return self._probe('cpuinfo')
 
     def _get_cpu_vendor(self):
-        vendor = subprocess.check_output(
-            "cat /proc/cpuinfo | grep 'vendor_id' | grep -ioE '(intel|amd)'",
-            shell=True, encoding='utf8').strip()
-        if re.match("intel", vendor, re.IGNORECASE):
-            return 'intel'
-        if re.match("amd", vendor, re.IGNORECASE):
-            return 'amd'
-        return 'unknown'
+        return self._get_cpuinfo().vendor
 
     def get_cpu_core(self):
         if "CPU Cores" in self.profile:
             self.cpu_core = self.profile["CPU Cores"]
             return self.cpu_core
 
-        try:
-            subprocess.check_output('cat /proc/cpuinfo | grep cores',
-                                    shell=True, encoding='utf8')
-        except subprocess.CalledProcessError:
+        self._check_interactive("CPU Cores")
+        self.cpu_core = self._get_cpuinfo().cores
+        if self.cpu_core is None:
             warning("Can not check the core number by /proc/cpuinfo. Assume the core number is 1")
             self.cpu_core = 1
-        else:
-            self.cpu_core = self._int_cmd(
-                "grep 'cpu cores' /proc/cpuinfo | sort -u | awk '{print $4}'")
 
         debug("CPU core: %s" % (self.cpu_core))
         self.profile["CPU Cores"] = self.cpu_core
         return self.cpu_core
 
-    def _float_cmd(self, command):
-        return float(subprocess.check_output(
-            command, shell=True, encoding='utf8').strip())
-
-    def _int_cmd(self, command):
-        return int(subprocess.check_output(
-            command, shell=True, encoding='utf8').strip())
-
     def get_cpu_clock(self):
         if "CPU Clock" in self.profile:
             self.cpu_clock = self.profile["CPU Clock"]
             return self.cpu_clock
 
-        if os.path.exists('/sys/devices/system/cpu/cpufreq/policy0/base_frequency'):
-            with open('/sys/devices/system/cpu/cpufreq/policy0/base_frequency') as f:
-                self.cpu_clock = float(f.read()) / 1000000
-        elif self._get_cpu_vendor() == 'intel':
-            self.cpu_clock = self._float_cmd(
-                "grep -oP '[0-9.]+GHz' /proc/cpuinfo | uniq | sed 's/GHz//'")
+        self._check_interactive("CPU Clock")
+        clocks = self._probe('cpufreq')
+        if clocks.base is not None:
+            self.cpu_clock = clocks.base
+        elif clocks.nominal is not None:
+            self.cpu_clock = clocks.nominal
+        elif self._get_cpu_vendor() == 'intel' and \
+                self._get_cpuinfo().clock is not None:
+            self.cpu_clock = self._get_cpuinfo().clock
+        elif clocks.maximum is not None:
+            self.cpu_clock = clocks.maximum
         else:
             self.cpu_clock = self.question_num("What is CPU frequency (GHz)?",
                                                "CPU Clock")
@@ -547,17 +1073,18 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
             self.mem_size = self.profile["Memory Size"]
             return self.mem_size
 
-        total_online = 0
-        block_size = 0
-        for online in Path('/sys/devices/system/memory').glob('*/online'):
-            with open(online, 'r') as f:
-                if f.read().strip() == '1':
-                    total_online = total_online + 1
-
-        with open('/sys/devices/system/memory/block_size_bytes') as f:
-            block_size = int(f.read().strip(), 16)
-
-        self.mem_size = block_size * total_online / 1024 / 1024 / 1024
+        self._check_interactive("Memory Size")
+        # The memory devices of the SMBIOS table give the installed size.
+        installed = sum(self._get_smbios().memory_devices)
+        if installed:
+            self.mem_size = installed / 1024
+        else:
+            try:
+                self.mem_size = self._probe('memory')
+            except ProbeError as err:
+                warning(str(err))
+                self.mem_size = self.question_num(
+                    "What is the memory size (GB)?", "Memory Size")
 
         debug("Memory size: %s GB" % (self.mem_size))
         self.profile["Memory Size"] = self.mem_size
@@ -569,9 +1096,8 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
             self.disk_num = self.profile["Disk Number"]
             return self.disk_num
 
-        self.disk_num = len(subprocess.check_output(
-            'ls /sys/block | grep -e sd -e nvme -e emmc',
-            shell=True, encoding='utf8').strip().split('\n'))
+        self._check_interactive("Disk Number")
+        self.disk_num = len(self._probe('disks'))
 
         debug("Disk number: %s" % (self.disk_num))
         self.profile["Disk Number"] = self.disk_num
@@ -617,20 +1143,42 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
     def get_display(self):
         return (self.diagonal, self.ep)
 
+    def _get_smbios(self):
+        return self._probe('smbios')
+
+    def get_memory_slots(self):
+        """Return the numbers of total and used memory slots.
+
+        None if the SMBIOS table is not readable."""
+        smbios = self._get_smbios()
+        if not smbios.find(16):
+            return None
+        used = len([size for size in smbios.memory_devices if size])
+        return (smbios.memory_slots, used)
+
     def get_dmi_info(self, info):
         base = '/sys/devices/virtual/dmi/id/'
-        if os.path.exists(base + info):
-            with open(base + info, "r") as data:
-                return data.read().strip().replace(' ', '_')
+        if host().exists(base + info):
+            return host().read_text(base + info).strip().replace(' ', '_')
 
     def get_bios_version(self):
         if "BIOS version" not in self.profile:
-            self.profile["BIOS version"] = self.get_dmi_info('bios_version')
+            version = self._get_smbios().bios_version
+            if version:
+                self.profile["BIOS version"] = version.replace(' ', '_')
+            else:
+                self.profile["BIOS version"] = \
+                    self.get_dmi_info('bios_version')
         return self.profile["BIOS version"]
 
     def get_product_name(self):
         if "Product name" not in self.profile:
-            self.profile["Product name"] = self.get_dmi_info('product_name')
+            name = self._get_smbios().product_name
+            if name:
+                self.profile["Product name"] = name.replace(' ', '_')
+            else:
+                self.profile["Product name"] = \
+                    self.get_dmi_info('product_name')
         return self.profile["Product name"]
 
     def get_resolution(self):
@@ -640,6 +1188,7 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
             self.height = self.profile["Display Height"]
             return (self.width, self.height)
 
+        self._check_interactive("Display Width", "Display Height")
         if self.width is None or self.height is None:
             self.edid_decode()
         self.profile["Display Width"] = self.width
@@ -649,6 +1198,15 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
     def get_power_consumptions(self):
         return (self.off, self.sleep, self.long_idle, self.short_idle)
 
+    def freeze(self):
+        """Return a FrozenSysInfo snapshot for the calculators."""
+        if self.product_type in (1, 3):
+            self.get_basic_info()
+        values = dict((name, getattr(self, name, None))
+                      for name in FROZEN_FIELDS)
+        values['profile'] = MappingProxyType(dict(self.profile))
+        return FrozenSysInfo(**values)
+
     def get_basic_info(self):
         return (self.get_cpu_core(), self.get_cpu_clock(),
                 self.get_mem_size(), self.get_disk_num())
@@ -667,8 +1225,10 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
             data.write('Devicie configuration details:')
             data.write('\n\tProduct Type: ' +
                        product_types[self.profile['Product Type'] - 1])
-            data.write('\n\tComputer Type: ' +
-                       computer_types[self.profile['Computer Type'] - 1])
+            # Only the product type 1 has a computer type.
+            if 'Computer Type' in self.profile:
+                data.write('\n\tComputer Type: ' +
+                           computer_types[self.profile['Computer Type'] - 1])
 
             for key in sorted(self.profile.keys()):
                 if key not in ('Off Mode', 'Sleep Mode', 'Short Idle Mode',
@@ -699,7 +1259,9 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
                       'Long Idle Mode',
                       'Sleep Mode',
                       'Off Mode'):
-                data.write('\n' + k + ': ' + str(self.profile[k]) + ' W')
+                # Not every product type measures every power mode.
+                if k in self.profile:
+                    data.write('\n' + k + ': ' + str(self.profile[k]) + ' W')
             data.write('\n')
 
     def save(self, filename):
@@ -711,3 +1273,255 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
             if 'SNAP_NAME' in os.environ and os.environ['SNAP_NAME'] == 'energy-tools':
                 error('Please execute `snap connect energy-tools:home` to get the permissions.')
             raise err
+
+
+class TestDrmEdid(unittest.TestCase):
+    def test_order(self):
+        with tempfile.TemporaryDirectory() as drm:
+            for name, status in (('card0-DP-1', 'disconnected'),
+                                 ('card0-HDMI-A-1', 'connected'),
+                                 ('card0-eDP-1', 'connected'),
+                                 ('card1-LVDS-1', 'disconnected')):
+                os.mkdir(os.path.join(drm, name))
+                with open(os.path.join(drm, name, 'status'), 'w') as f:
+                    f.write(status + '\n')
+                open(os.path.join(drm, name, 'edid'), 'wb').close()
+            os.mkdir(os.path.join(drm, 'version'))
+            self.assertEqual([path.parent.name
+                              for path in drm_edid_paths(drm)],
+                             ['card0-eDP-1', 'card0-HDMI-A-1',
+                              'card1-LVDS-1', 'card0-DP-1'])
+
+
+class TestMemorySize(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.memory = os.path.join(self.tmpdir.name, 'memory')
+        self.meminfo = os.path.join(self.tmpdir.name, 'meminfo')
+        os.mkdir(self.memory)
+        with open(os.path.join(self.memory, 'block_size_bytes'), 'w') as f:
+            f.write('8000000\n')
+        for i in range(40):
+            os.mkdir(os.path.join(self.memory, 'memory%d' % i))
+            with open(os.path.join(self.memory, 'memory%d' % i,
+                                   'online'), 'w') as f:
+                f.write('1\n' if i < 32 else '0\n')
+        os.mkdir(os.path.join(self.memory, 'power'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_scan(self):
+        self.assertEqual(online_memory_blocks(self.memory), 32)
+        self.assertEqual(memory_size(self.memory, self.meminfo), 4.0)
+
+    def test_meminfo(self):
+        with open(self.meminfo, 'w') as f:
+            f.write('MemTotal:        5951364 kB\nMemFree:  1 kB\n')
+        self.assertEqual(memory_size(self.memory, self.meminfo), 6.0)
+
+    def test_many_blocks(self):
+        for i in range(40, 4096):
+            os.mkdir(os.path.join(self.memory, 'memory%d' % i))
+            with open(os.path.join(self.memory, 'memory%d' % i,
+                                   'online'), 'w') as f:
+                f.write('1\n')
+        with open(self.meminfo, 'w') as f:
+            f.write('MemTotal:       534521856 kB\n')
+
+        reads = []
+
+        class CountingHost(Host):
+            def read(self, path, size=-1):
+                reads.append(path)
+                return super().read(path, size)
+
+            def listdir(self, path):
+                reads.append(path)
+                return super().listdir(path)
+
+        previous = set_host(CountingHost())
+        try:
+            self.assertEqual(memory_size(self.memory, self.meminfo), 510.0)
+        finally:
+            set_host(previous)
+        self.assertEqual(reads, [self.meminfo])
+        self.assertEqual(online_memory_blocks(self.memory), 4088)
+
+    def test_unreadable(self):
+        memory = os.path.join(self.tmpdir.name, 'none')
+        self.assertRaises(ValueError, memory_size, memory, self.meminfo)
+
+
+class TestDisks(unittest.TestCase):
+    def test_block_devices(self):
+        with tempfile.TemporaryDirectory() as block:
+            for name in ('sdb', 'loop0', 'nvme0n1', 'sda', 'mmcblk0', 'zram0'):
+                os.mkdir(os.path.join(block, name))
+            self.assertEqual(block_devices(block), ['nvme0n1', 'sda', 'sdb'])
+
+    def test_system_disks(self):
+        mounts = parse_mountinfo("""\
+23 28 0:22 / /proc rw,relatime - proc proc rw
+28 1 259:2 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw
+30 28 259:1 / /boot/efi rw,relatime shared:2 - vfat /dev/nvme0n1p1 rw
+31 28 8:17 / /media/boot\\040disk rw - ext4 /dev/sdb1 rw
+32 28 8:1 / /boot rw - ext4 /dev/sda1 rw
+""")
+        self.assertEqual(mounts[1], Mount('/', '/dev/nvme0n1p2'))
+        self.assertEqual(mounts[3].mount_point, '/media/boot disk')
+        self.assertEqual(system_disks(['nvme0n1', 'sda', 'sdb', 'sda1x'],
+                                      mounts), {'nvme0n1', 'sda'})
+        self.assertEqual(parent_disk('sda12', ['sd', 'sda']), 'sda')
+
+    def test_classify_storage(self):
+        with tempfile.TemporaryDirectory() as block:
+            for name, rotational, model in (
+                    ('nvme0n1', '0', 'Samsung SSD 970 EVO Plus 1TB'),
+                    ('sda', '1', 'ST1000DM010-2EP102'),
+                    ('sdb', '1', 'WDC WD10SPZX-21Z10T0'),
+                    ('sdc', '1', 'ST1000LX015-1U7172 SSHD'),
+                    ('sdd', '0', 'KINGSTON SA400S37240G'),
+                    ('sde', '1', 'VBOX HARDDISK'),
+                    ('sdf', None, None)):
+                os.makedirs(os.path.join(block, name, 'queue'))
+                os.makedirs(os.path.join(block, name, 'device'))
+                if rotational is not None:
+                    with open(os.path.join(block, name, 'queue',
+                                           'rotational'), 'w') as f:
+                        f.write(rotational + '\n')
+                    with open(os.path.join(block, name, 'device',
+                                           'model'), 'w') as f:
+                        f.write(model + '\n')
+            facts = block_device_facts(block)
+        self.assertEqual(dict((disk, classify_storage(device))
+                              for disk, device in facts.items()),
+                         {'nvme0n1': SSD, 'sda': HDD_3_5, 'sdb': HDD_2_5,
+                          'sdc': HYBRID, 'sdd': SSD, 'sde': None,
+                          'sdf': None})
+        self.assertEqual(classify_storage(facts['sde'], 3), HDD_2_5)
+
+
+class TestProbeReplay(unittest.TestCase):
+    def test_replay(self):
+        names = ['chassis', 'cpufreq', 'disks', 'memory', 'mountinfo',
+                 'storage']
+        recorder = RecordingHost()
+        previous = set_host(recorder)
+        try:
+            recorded = Prober(names).run().results
+            with tempfile.TemporaryDirectory() as tmpdir:
+                tarball = os.path.join(tmpdir, 'probe.tar.gz')
+                recorder.save(tarball)
+                set_host(ReplayHost.load(tarball))
+            replayed = Prober(names).run().results
+        finally:
+            set_host(previous)
+        self.assertEqual(dict((name, str(value))
+                              for name, value in recorded.items()),
+                         dict((name, str(value))
+                              for name, value in replayed.items()))
+
+
+class TestCpuFreq(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cpu = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, path, value):
+        path = os.path.join(self.cpu, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(value + '\n')
+
+    def test_hybrid(self):
+        # One P-core with two threads and two E-cores
+        for n, siblings, base in ((0, '0-1', '2300000'),
+                                  (1, '0-1', '2300000'),
+                                  (2, '2', '1700000'),
+                                  (3, '3', '1700000')):
+            self.write('cpu%d/topology/thread_siblings_list' % n, siblings)
+            self.write('cpufreq/policy%d/related_cpus' % n, str(n))
+            self.write('cpufreq/policy%d/base_frequency' % n, base)
+            self.write('cpufreq/policy%d/cpuinfo_max_freq' % n, '4700000')
+        clocks = cpufreq_clocks(self.cpu)
+        self.assertAlmostEqual(3 * clocks.base, 2.3 + 2 * 1.7)
+        self.assertIsNone(clocks.nominal)
+        self.assertAlmostEqual(clocks.maximum, 4.7)
+
+    def test_cppc(self):
+        for policy, cpus in ((0, '0 1'), (2, '2 3')):
+            self.write('cpufreq/policy%d/related_cpus' % policy, cpus)
+            self.write('cpufreq/policy%d/cpuinfo_max_freq' % policy,
+                       '4400000')
+            self.write('cpu%d/acpi_cppc/nominal_freq' % policy, '3400')
+        clocks = cpufreq_clocks(self.cpu)
+        self.assertEqual(clocks, CpuFreq(None, 3.4, 4.4))
+        self.assertEqual(cpu_list('0-2,8 10'), [0, 1, 2, 8, 10])
+        self.assertEqual(cpufreq_clocks(os.path.join(self.cpu, 'none')),
+                         CpuFreq(None, None, None))
+
+
+class TestEthernet(unittest.TestCase):
+    def test_eee_speed(self):
+        output = """EEE Settings for enp0s31f6:
+\tEEE status: enabled - active
+\tTx LPI: 17 (us)
+\tSupported EEE link modes:  100baseT/Full
+\t                           1000baseT/Full
+\tAdvertised EEE link modes:  100baseT/Full
+\t                            1000baseT/Full
+"""
+        self.assertEqual(eee_speed(output), 'one')
+        self.assertIsNone(eee_speed(output.replace('enabled', 'disabled')))
+        self.assertEqual(eee_speed(output.replace('1000baseT', '2500baseT')),
+                         'one_to_ten')
+        self.assertIsNone(eee_speed(None))
+
+    class FakeHost(Host):
+        """Fake interfaces answering ETHTOOL_GEEE"""
+        def __init__(self, interfaces, outputs):
+            self.interfaces = interfaces
+            self.outputs = outputs
+            self.commands = []
+
+        def listdir(self, path):
+            return list(self.interfaces) + ['lo']
+
+        def exists(self, path):
+            return False
+
+        def ethtool_eee(self, dev):
+            eee = self.interfaces[dev]
+            if isinstance(eee, int):
+                raise OSError(eee, os.strerror(eee))
+            return eee
+
+        def run(self, args, timeout=None):
+            self.commands.append(args)
+            return self.outputs[args[-1]]
+
+    def test_ethtool_eee(self):
+        output = "EEE status: enabled - active\n\t2500baseT/Full\n"
+        fake = self.FakeHost({'eno1': ((1 << 3) | (1 << 5), 0, 0, 1, 1),
+                              'eno2': ((1 << 5) | (1 << 12), 0, 0, 1, 1),
+                              'enp1s0': ((1 << 12), 0, 0, 0, 0),
+                              'enp2s0': (0, 0, 0, 1, 1),
+                              'enp3s0': errno.EOPNOTSUPP,
+                              'eth0': errno.ENODEV},
+                             {'enp2s0': output, 'eth0': output})
+        previous = set_host(fake)
+        try:
+            ethernet = probe_ethernet()
+        finally:
+            set_host(previous)
+        self.assertEqual(ethernet, Ethernet(2, 2, 0, False))
+        self.assertEqual(sorted(args[-1] for args in fake.commands),
+                         ['enp2s0', 'eth0'])
+
+
+if __name__ == '__main__':
+    unittest.main()